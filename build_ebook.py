@@ -1,19 +1,22 @@
 import datetime
-import re
+import mmap
+import os
 import uuid
-from collections.abc import MutableSequence, Sequence
+from collections.abc import Mapping, MutableSequence, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
 
 from ebooklib import epub
-from markdown_it import MarkdownIt
 
 from ebooklib_patch import SWEpubCoverHtml, write_epub
+from file_cache import read_text
 from issue_info import IssueInfo, get_issue_info
-from renderers import render_poem_for_ebook, render_story_for_ebook
-
-md = MarkdownIt("commonmark", {"typographer": True})
-md.enable(["replacements", "smartquotes"])
-
+from renderers import (
+    render_markdown_for_ebook,
+    render_poem_for_ebook,
+    render_story_for_ebook,
+)
 
 magazine_subjects = [
     "magazine",
@@ -29,17 +32,60 @@ magazine_subjects = [
 ]
 
 
-def _avatar_path_to_author_img_src(path: Path) -> str:
-    """Get the ebook path to the author avatar given the path to the avatar."""
-    m = re.search("(\d+)", path.stem)
-    if not m:
-        raise RuntimeError(f"Expected the avatar path {path} to start with a number")
-    return f"{m.group(0)}-author.jpg"
+def _map_file(path: Path, maps: ExitStack) -> mmap.mmap | bytes:
+    """Memory-map a file read-only.
+
+    The ebook writer only needs the bytes long enough to copy them into the epub,
+    so mapping the file lets the OS page it in instead of holding a copy in memory.
+
+    :param path: Path to the file.
+    :param maps: Stack to close the map on once the ebook has been written.
+    :return: The mapped file, or empty bytes for an empty file, which can't be mapped.
+    """
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return maps.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _render_piece(path: Path, kind: str) -> str:
+    """Render a piece's Markdown file to ebook HTML."""
+    if kind == "poem":
+        return render_poem_for_ebook(path)
+    return render_story_for_ebook(path)
+
+
+def render_markdown(
+    front_matter_paths: Sequence[Path], info: IssueInfo
+) -> dict[Path, str]:
+    """Render all of the issue's Markdown files to ebook HTML.
+
+    The files are independent of each other, so they're rendered in parallel.
+
+    :param front_matter_paths: List of paths to the front matter content (as markdown files).
+    :param info: Information about the issue.
+    :return: Dictionary mapping each Markdown file's path to its HTML.
+    """
+    md_paths = [*front_matter_paths, *info.bio_paths]
+    # The about page was already read to find the issue number, so read
+    # these here where that text is cached rather than in the workers
+    md_texts = [read_text(p) for p in md_paths]
+    # An author with more than one piece in the issue has the same bio
+    # for each, so only render each distinct text once
+    unique_texts = list(dict.fromkeys(md_texts))
+    with ProcessPoolExecutor() as executor:
+        md_htmls = executor.map(render_markdown_for_ebook, unique_texts)
+        piece_htmls = executor.map(_render_piece, info.piece_paths, info.piece_kinds)
+        text_htmls = dict(zip(unique_texts, md_htmls))
+        rendered = {p: text_htmls[text] for p, text in zip(md_paths, md_texts)}
+        rendered.update(zip(info.piece_paths, piece_htmls))
+    return rendered
 
 
 def add_cover(
     book: epub.EpubBook,
     cover_path: Path,
+    maps: ExitStack,
     title: str = "Cover",
 ) -> SWEpubCoverHtml:
     """Create and add cover to the ebook.
@@ -48,13 +94,12 @@ def add_cover(
 
     :param book: Book to add cover to.
     :param cover_path: Path to the cover image file.
+    :param maps: Stack to close the cover image's memory map on.
     :param title: Title to give the page containing the cover in the ebook.
     :return: Created cover page.
     """
 
-    content = cover_path.read_bytes()
-
-    book.set_cover(cover_path.name, content, create_page=False)
+    book.set_cover(cover_path.name, _map_file(cover_path, maps), create_page=False)
     c1 = SWEpubCoverHtml(
         title=title, file_name="cover.xhtml", image_name=cover_path.name
     )
@@ -97,91 +142,102 @@ def add_metadata(
 
 
 def create_front_matter(
+    book: epub.EpubBook,
+    css: epub.EpubItem,
     paths: Sequence[Path],
     titles: Sequence[str],
+    rendered: Mapping[Path, str],
     ebook_chs: MutableSequence[epub.EpubItem],
 ):
     """Create ebook front matter.
 
-    Front matter is created and added in-place to ebook_chs.
+    Front matter is added to the book and in-place to ebook_chs.
 
+    :param book: Book to add the front matter to.
+    :param css: Stylesheet to attach to each front matter page.
     :param paths: List of paths to the front matter content (as markdown files).
     :param titles: List of titles for each front matter.
+    :param rendered: HTML for each Markdown file, keyed by path.
     :param ebook_chs: List of previously-added items.
     """
     for path, title in zip(paths, titles):
         ch = epub.EpubHtml(
             title=title, file_name=f"body{len(ebook_chs):02}.xhtml", lang="en"
         )
-        ch.set_content(
-            '<div class="frontmatter">'
-            + md.render(path.read_text(encoding="utf-8"))
-            + "</div>"
-        )
+        ch.set_content('<div class="frontmatter">' + rendered[path] + "</div>")
+        ch.add_item(css)
+        book.add_item(ch)
         ebook_chs.append(ch)
 
 
 def create_content(
+    book: epub.EpubBook,
+    css: epub.EpubItem,
     info: IssueInfo,
+    rendered: Mapping[Path, str],
     ebook_chs: MutableSequence[epub.EpubItem],
 ) -> None:
     """Create ebook content.
 
-    Content is created and added in-place to ebook_chs.
+    Content is added to the book and in-place to ebook_chs.
 
+    :param book: Book to add the content to.
+    :param css: Stylesheet to attach to each piece's page.
     :param info: Information about the issue.
+    :param rendered: HTML for each Markdown file, keyed by path.
     :param ebook_chs: List of previously-added items.
     """
     current_year = datetime.datetime.now().year
-    for ndx, (piece_path, _, title, bio_path, author, avatar_path) in enumerate(
-        info.piece_info()
-    ):
-        content = '<div class="piece">\n'
-
-        if "poem" in str(piece_path):
-            content += render_poem_for_ebook(piece_path)
-        else:
-            content += render_story_for_ebook(piece_path)
+    for piece_path, kind, _, title, bio_path, author, avatar_path in info.piece_info():
+        piece_html = rendered[piece_path]
+        parts = ['<div class="piece">\n']
 
-        if "reprint" not in str(piece_path):
+        if kind != "reprint":
             # Add the end div and copyright statement
-            content += f'</div>\n\n<div class="endmatter">\n<p>Copyright © {current_year} by {author}</p>\n</div>\n\n'
+            parts.append(piece_html)
+            parts.append(
+                f'</div>\n\n<div class="endmatter">\n<p>Copyright © {current_year} by {author}</p>\n</div>\n\n'
+            )
         else:
             # Add the end div before the already-given copyright statement
-            ndx = content.find("<p>Copyright ©")
-            if ndx == -1:
+            cut = piece_html.find("<p>Copyright ©")
+            if cut == -1:
                 print(f"Warning: Couldn't find copyright statement in {piece_path}")
+                parts.append(piece_html)
             else:
-                content = (
-                    content[:ndx]
-                    + '</div>\n\n<div class="endmatter">\n'
-                    + content[ndx:]
-                    + "</div>\n\n"
-                )
+                parts.append(piece_html[:cut])
+                parts.append('</div>\n\n<div class="endmatter">\n')
+                parts.append(piece_html[cut:])
+                parts.append("</div>\n\n")
 
         # Add author bio and link to headshot
-        avatar_src = _avatar_path_to_author_img_src(avatar_path)
-        content += (
+        # add_images puts each avatar in the ebook under its own filename
+        parts.append(
             f'<p class="author-pic"><img class="author" '
-            + f'src="{avatar_src}" alt="{author}"/></p>\n\n'
+            + f'src="{avatar_path.name}" alt="{author}"/></p>\n\n'
         )
-        content += md.render(bio_path.read_text(encoding="utf-8"))
+        parts.append(rendered[bio_path])
+        content = "".join(parts)
 
         ch = epub.EpubHtml(
             title=title, file_name=f"body{len(ebook_chs):02}.xhtml", lang="en"
         )
         ch.set_content(content)
+        ch.add_item(css)
+        book.add_item(ch)
         ebook_chs.append(ch)
 
 
 def add_images(
     book: epub.EpubBook,
     avatar_paths: Sequence[Path],
+    maps: ExitStack,
 ) -> None:
     """Add image files to the ebook.
 
     :param book: Book to add metadata to.
     :param avatar_paths: Paths to the authors' avatars.
+    :param maps: Stack to close the avatars' memory maps on.
     """
     for avatar_path in avatar_paths:
         book.add_item(
@@ -189,7 +245,7 @@ def add_images(
                 uid=avatar_path.stem,
                 file_name=avatar_path.name,
                 media_type="image/jpeg",
-                content=avatar_path.read_bytes(),
+                content=_map_file(avatar_path, maps),
             )
         )
 
@@ -210,6 +266,9 @@ def build_ebook():
     stylesheet_path = root_path / "stylesheet.css"
 
     info = get_issue_info(content_path)
+    # Unlike the website, the ebook can't do without its cover
+    if not info.cover_path.is_file():
+        raise FileNotFoundError(f"Missing cover image {info.cover_path}")
 
     book = epub.EpubBook()
 
@@ -224,31 +283,33 @@ def build_ebook():
     )
     book.add_item(css)
 
-    cover = add_cover(book, info.cover_path, title="Cover")
-
-    ebook_chs = []  # Keep track of what we're adding to the ebook
+    # The images are memory-mapped until they've been copied into the epub
+    with ExitStack() as maps:
+        cover = add_cover(book, info.cover_path, maps, title="Cover")
 
-    # Add NCX and nav
-    book.add_item(epub.EpubNcx())
-    nav = epub.EpubNav(title="Table of Contents")
-    ebook_chs.append(nav)
+        ebook_chs = []  # Keep track of what we're adding to the ebook
 
-    create_front_matter(front_matter_paths, front_matter_titles, ebook_chs)
-    create_content(info, ebook_chs)
+        # Add NCX and nav
+        book.add_item(epub.EpubNcx())
+        nav = epub.EpubNav(title="Table of Contents")
+        nav.add_item(css)
+        book.add_item(nav)
+        ebook_chs.append(nav)
 
-    # Add CSS to each ebook chapter and add the chapter to the book
-    for ch in ebook_chs:
-        ch.add_item(css)
-        book.add_item(ch)
+        rendered = render_markdown(front_matter_paths, info)
+        create_front_matter(
+            book, css, front_matter_paths, front_matter_titles, rendered, ebook_chs
+        )
+        create_content(book, css, info, rendered, ebook_chs)
 
-    add_images(book, info.avatar_paths)
+        add_images(book, info.avatar_paths, maps)
 
-    full_contents = [cover] + ebook_chs
+        full_contents = [cover] + ebook_chs
 
-    book.spine = tuple(full_contents)
-    book.toc = tuple(full_contents)
+        book.spine = tuple(full_contents)
+        book.toc = tuple(full_contents)
 
-    write_epub(f"Small Wonders Magazine Issue {info.issue_num}.epub", book)
+        write_epub(f"Small Wonders Magazine Issue {info.issue_num}.epub", book)
 
 
 if __name__ == "__main__":
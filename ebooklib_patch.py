@@ -1,4 +1,6 @@
 import os
+import struct
+import zipfile
 from contextlib import suppress
 from pathlib import Path
 
@@ -8,18 +10,80 @@ from ebooklib.epub import (
     NAMESPACES,
     EpubHtml,
     EpubNav,
+    EpubNcx,
     Link,
     Section,
     get_pages_for_items,
     parse_string,
 )
 from lxml import etree
-from PIL import Image
 
 if epub.VERSION != (0, 18, 1):
     raise ImportWarning(f"Expected ebooklib version (0, 18, 1) but got {epub.VERSION}")
 
 
+# JPEG start-of-frame markers, which lead the segment holding the image's dimensions
+_JPEG_SOF_MARKERS = frozenset(
+    (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF)
+)
+
+
+def _jpeg_size(path: Path) -> tuple[int, int]:
+    """Get a JPEG's dimensions by reading its start-of-frame header.
+
+    Only the segment headers ahead of the start-of-frame segment are read, so no
+    image data is loaded or decoded.
+
+    :param path: Path to the JPEG file.
+    :raises ValueError: If the file isn't a JPEG or has no start-of-frame segment.
+    :return: Tuple of the image's width and height.
+    """
+    with path.open("rb") as f:
+        if f.read(2) != b"\xff\xd8":
+            raise ValueError(f"{path} isn't a JPEG file")
+        while byte := f.read(1):
+            if byte != b"\xff":
+                continue
+            marker = f.read(1)
+            # Markers can be padded with any number of 0xFF fill bytes
+            while marker == b"\xff":
+                marker = f.read(1)
+            if not marker:
+                break
+            code = marker[0]
+            # These markers stand alone without a segment length
+            if code in (0x00, 0x01) or 0xD0 <= code <= 0xD9:
+                continue
+            try:
+                (length,) = struct.unpack(">H", f.read(2))
+                if code in _JPEG_SOF_MARKERS:
+                    _, height, width = struct.unpack(">BHH", f.read(5))
+                    return width, height
+            except struct.error as e:
+                # The file ended partway through a segment header
+                raise ValueError(f"{path} is a truncated JPEG file") from e
+            f.seek(length - 2, os.SEEK_CUR)
+    raise ValueError(f"Couldn't find the image size in {path}")
+
+
+# The cover page, filled in with the cover's width, height, and image name
+_COVER_XHTML_TEMPLATE = b"""<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" lang="en" xml:lang="en">
+ <head>
+  <style>
+    body { margin: 0em; padding: 0em; }
+    img { max-width: 100%%; max-height: 100%%; }
+  </style>
+ </head>
+ <body>
+   <svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+   height="100%%" width="100%%" viewBox="0 0 %d %d" preserveAspectRatio="xMidYMid meet" version="1.1">
+     <image href="%s" alt="Cover art"/></svg>
+ </body>
+</html>"""
+
+
 # Adapted from the ebooklib class so I could tweak it -- the existing class lower-cases all
 # xml attributes, which wrecks the viewBox attribute
 class SWEpubCoverHtml(epub.EpubHtml):
@@ -44,30 +108,13 @@ class SWEpubCoverHtml(epub.EpubHtml):
         return self.content
 
     def _get_cover_html_content(self, cover_path: Path) -> bytes:
-        with Image.open(cover_path) as img:
-            cover_width, cover_height = img.size
+        cover_width, cover_height = _jpeg_size(cover_path)
 
-        return (
-            """<?xml version="1.0" encoding="UTF-8"?>
-<!DOCTYPE html>
-<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops" lang="en" xml:lang="en">
- <head>
-  <style>
-    body { margin: 0em; padding: 0em; }
-    img { max-width: 100%; max-height: 100%; }
-  </style>
- </head>
- <body>
-   <svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
-   height="100%" width="100%" viewBox="0 0 """
-            + f"{cover_width} {cover_height}"
-            + '''" preserveAspectRatio="xMidYMid meet" version="1.1">
-     <image href="'''
-            + self.image_name
-            + """" alt="Cover art"/></svg>
- </body>
-</html>"""
-        ).encode()
+        return _COVER_XHTML_TEMPLATE % (
+            cover_width,
+            cover_height,
+            self.image_name.encode(),
+        )
 
     def __str__(self):
         return "<EpubCoverHtml:%s:%s>" % (self.id, self.file_name)
@@ -76,6 +123,31 @@ class SWEpubCoverHtml(epub.EpubHtml):
 class SWEpubWriter(epub.EpubWriter):
     """Adaption of the base class to tweak its output."""
 
+    def _write_items(self):
+        for item in self.book.get_items():
+            if isinstance(item, EpubNcx):
+                self.out.writestr(
+                    "%s/%s" % (self.book.FOLDER_NAME, item.file_name), self._get_ncx()
+                )
+            elif isinstance(item, EpubNav):
+                self.out.writestr(
+                    "%s/%s" % (self.book.FOLDER_NAME, item.file_name),
+                    self._get_nav(item),
+                )
+            elif item.manifest:
+                # SRG: images are already compressed, so deflating them just burns time
+                if item.media_type.startswith("image/"):
+                    compress_type = zipfile.ZIP_STORED
+                else:
+                    compress_type = zipfile.ZIP_DEFLATED
+                self.out.writestr(
+                    "%s/%s" % (self.book.FOLDER_NAME, item.file_name),
+                    item.get_content(),
+                    compress_type=compress_type,
+                )
+            else:
+                self.out.writestr("%s" % item.file_name, item.get_content())
+
     def _get_nav(self, item):
         # just a basic navigation for now
         nav_xml = parse_string(self.book.get_template("nav"))
@@ -86,6 +158,10 @@ class SWEpubWriter(epub.EpubWriter):
 
         nav_dir_name = os.path.dirname(item.file_name)
 
+        def _relpath(path):
+            """SRG The nav usually sits at the top of the book, where hrefs are already relative to it"""
+            return os.path.relpath(path, nav_dir_name) if nav_dir_name else path
+
         head = etree.SubElement(root, "head")
         title = etree.SubElement(head, "title")
         title.text = item.title or self.book.title
@@ -120,20 +196,17 @@ class SWEpubWriter(epub.EpubWriter):
             """SRG Creates a table of contents with links in paragraphs instead of ordered lists"""
             div = etree.SubElement(itm, "div", {"class": "toc"})
             for item in items:
-                p = etree.SubElement(div, "p")
                 if isinstance(item, tuple) or isinstance(item, list):
                     raise NotImplementedError(
                         "I haven't implemented lists for Table of Contents"
                     )
                 elif isinstance(item, Link):
-                    p = etree.SubElement(
-                        itm, "a", {"href": os.path.relpath(item.href, nav_dir_name)}
-                    )
+                    p = etree.SubElement(div, "p")
+                    a = etree.SubElement(p, "a", {"href": _relpath(item.href)})
                     a.text = item.title
                 elif isinstance(item, EpubHtml):
-                    a = etree.SubElement(
-                        p, "a", {"href": os.path.relpath(item.file_name, nav_dir_name)}
-                    )
+                    p = etree.SubElement(div, "p")
+                    a = etree.SubElement(p, "a", {"href": _relpath(item.file_name)})
                     a.text = item.title
 
         def _create_section(itm, items):
@@ -146,19 +219,19 @@ class SWEpubWriter(epub.EpubWriter):
                         a = etree.SubElement(
                             li,
                             "a",
-                            {"href": os.path.relpath(item[0].file_name, nav_dir_name)},
+                            {"href": _relpath(item[0].file_name)},
                         )
                     elif isinstance(item[0], Section) and item[0].href != "":
                         a = etree.SubElement(
                             li,
                             "a",
-                            {"href": os.path.relpath(item[0].href, nav_dir_name)},
+                            {"href": _relpath(item[0].href)},
                         )
                     elif isinstance(item[0], Link):
                         a = etree.SubElement(
                             li,
                             "a",
-                            {"href": os.path.relpath(item[0].href, nav_dir_name)},
+                            {"href": _relpath(item[0].href)},
                         )
                     else:
                         a = etree.SubElement(li, "span")
@@ -168,15 +241,11 @@ class SWEpubWriter(epub.EpubWriter):
 
                 elif isinstance(item, Link):
                     li = etree.SubElement(ol, "li")
-                    a = etree.SubElement(
-                        li, "a", {"href": os.path.relpath(item.href, nav_dir_name)}
-                    )
+                    a = etree.SubElement(li, "a", {"href": _relpath(item.href)})
                     a.text = item.title
                 elif isinstance(item, EpubHtml):
                     li = etree.SubElement(ol, "li")
-                    a = etree.SubElement(
-                        li, "a", {"href": os.path.relpath(item.file_name, nav_dir_name)}
-                    )
+                    a = etree.SubElement(li, "a", {"href": _relpath(item.file_name)})
                     a.text = item.title
 
         _create_toc_section(nav, self.book.toc)  # SRG to get rid of the ordered list
@@ -218,7 +287,7 @@ class SWEpubWriter(epub.EpubWriter):
                         % NAMESPACES["EPUB"]: guide_to_landscape_map.get(
                             guide_type, guide_type
                         ),
-                        "href": os.path.relpath(_href, nav_dir_name),
+                        "href": _relpath(_href),
                     },
                 )
                 a_item.text = _title
@@ -258,13 +327,17 @@ class SWEpubWriter(epub.EpubWriter):
                         li_item,
                         "a",
                         {
-                            "href": os.path.relpath(_href, nav_dir_name),
+                            "href": _relpath(_href),
                         },
                     )
                     a_item.text = _title
 
+        # SRG: e-readers don't need the indentation, so only pretty-print on request
         tree_str = etree.tostring(
-            nav_xml, pretty_print=True, encoding="utf-8", xml_declaration=True
+            nav_xml,
+            pretty_print=self.options.get("pretty_nav", False),
+            encoding="utf-8",
+            xml_declaration=True,
         )
 
         return tree_str
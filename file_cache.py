@@ -0,0 +1,37 @@
+from functools import lru_cache
+from pathlib import Path
+
+
+@lru_cache(maxsize=64)
+def _read_text(path: Path, mtime_ns: int) -> str:
+    return path.read_text(encoding="utf-8")
+
+
+def read_text(path: Path) -> str:
+    """Read a UTF-8 text file, reusing the contents from a previous read if the
+    file hasn't been modified since.
+
+    Pieces are read once to find their titles and authors and again to render
+    them, so this keeps the second read from hitting the disk.
+
+    :param path: Path to the file.
+    :return: The file's contents.
+    """
+    return _read_text(path, path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=64)
+def _read_lines(path: Path, mtime_ns: int) -> tuple[str, ...]:
+    return tuple(_read_text(path, mtime_ns).splitlines())
+
+
+def read_lines(path: Path) -> tuple[str, ...]:
+    """Read a UTF-8 text file's lines, reusing them from a previous read if the
+    file hasn't been modified since.
+
+    Poems are scanned line by line both to find their titles and to render them.
+
+    :param path: Path to the file.
+    :return: The file's lines, without line endings.
+    """
+    return _read_lines(path, path.stat().st_mtime_ns)
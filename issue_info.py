@@ -1,10 +1,21 @@
+import os
 import re
 from collections.abc import Generator, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from itertools import pairwise
 from pathlib import Path
 
-from markdown_it import MarkdownIt
+from file_cache import read_lines, read_text
+
+_ISSUE_RE = re.compile(r"Issue +(\d+)")
+# Level one or two ATX heading, which can be empty
+_HEADING_RE = re.compile(r" {0,3}(#{1,2})(?:[ \t]+(.*))?")
+# A heading's optional closing run of hashes, which may be all it has
+_CLOSING_HASHES_RE = re.compile(r"(?:^|[ \t]+)#+$")
+# Blockquote marker at the start of a line
+_BLOCKQUOTE_RE = re.compile(r" {0,3}> ?")
+# Opening of a fenced code block
+_FENCE_RE = re.compile(r" {0,3}(`{3,}(?=[^`]*$)|~{3,})")
 
 
 @dataclass
@@ -17,28 +28,31 @@ class IssueInfo:
     editors: list[str]
 
     piece_paths: list[Path]
+    piece_kinds: list[str]
     piece_post_days: list[int]
     titles: list[str]
     bio_paths: list[Path]
     author_names: list[str]
     avatar_paths: list[Path]
 
-    def piece_info(self) -> Generator[Path, int, str, Path, str, Path]:
+    def piece_info(self) -> Generator[Path, str, int, str, Path, str, Path]:
         """Get iterable over aggregated piece info.
 
         Aggregated piece info:
           - Path to the piece (Markdown)
+          - Kind of piece ("story", "poem", or "reprint")
           - Number of days into the issue to post the piece
           - Title
           - Path to the author's bio (Markdown)
           - Author name
           - Path to the author's avatar (jpeg)
 
-        :yield: Iterator that produces tuples of (piece path, post day,
-        title, bio path, author name, avatar path).
+        :yield: Iterator that produces tuples of (piece path, piece kind,
+        post day, title, bio path, author name, avatar path).
         """
         return zip(
             self.piece_paths,
+            self.piece_kinds,
             self.piece_post_days,
             self.titles,
             self.bio_paths,
@@ -57,7 +71,7 @@ def get_issue_num(about_path: Path) -> int:
     :raises RuntimeError: If the issue number isn't found.
     :return: The issue number.
     """
-    m = re.search("Issue +(\d+)", about_path.read_text())
+    m = _ISSUE_RE.search(read_text(about_path))
     if m is None:
         raise RuntimeError(f"Couldn't find issue number in {about_path}")
     return int(m.group(1))
@@ -69,7 +83,51 @@ def get_editors(editors_path: Path) -> Sequence[str]:
     :param editors_path: Path to the text file with the editors' names, one on a line.
     :return: List of the editors' names.
     """
-    return [e.strip() for e in editors_path.read_text().splitlines()]
+    return [e.strip() for e in read_text(editors_path).splitlines()]
+
+
+def _strip_by(author: str) -> str:
+    """Remove a leading "By " or "by " from an author's name."""
+    if author[:3] in ("By ", "by "):
+        author = author[3:].lstrip(" ")
+    return author
+
+
+def _get_title_and_author(piece_path: Path) -> tuple[str | None, str | None]:
+    """Get the title and author from a piece's file, or None for any that are missing.
+
+    Only the first two headings matter, so lines are scanned for ATX headings rather
+    than parsing the whole file as Markdown. Headings in blockquotes count, and ones
+    in fenced code blocks don't, as with a full parse. Unlike a full parse, a heading
+    inside a list item isn't found, and a heading-like line inside an HTML block is.
+    """
+    title = None
+    author = None
+    fence = None
+    for line in read_lines(piece_path):
+        while m := _BLOCKQUOTE_RE.match(line):
+            line = line[m.end() :]
+        if fence is not None:
+            # A closing fence is at least as long as the opening one, with nothing after
+            stripped = line.strip()
+            if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                fence = None
+            continue
+        if m := _FENCE_RE.match(line):
+            fence = m.group(1)
+            continue
+        m = _HEADING_RE.fullmatch(line)
+        if m is None:
+            continue
+        content = _CLOSING_HASHES_RE.sub("", (m.group(2) or "").strip())
+        if m.group(1) == "#":
+            if title is None:
+                title = content
+        elif author is None:
+            author = _strip_by(content)
+        if title is not None and author is not None:
+            break
+    return title, author
 
 
 def get_titles_and_authors(
@@ -85,23 +143,15 @@ def get_titles_and_authors(
     :raises RuntimeError: If any files lack a title or an author.
     :return: A tuple containing the list of titles and the list of authors.
     """
-    md = MarkdownIt("commonmark", {"typographer": True})
-    md.enable(["replacements", "smartquotes"])
+    piece_paths = list(piece_paths)
+    # The files are independent, so read them in parallel to overlap the I/O
+    with ThreadPoolExecutor() as executor:
+        found = list(executor.map(_get_title_and_author, piece_paths))
 
     titles = []
     authors = []
     errs = []
-    for fp in piece_paths:
-        content = md.parse(fp.read_text(encoding="utf-8"))
-        title = None
-        author = None
-        for cur_token, next_token in pairwise(content):
-            if cur_token.markup == "#" and title is None:
-                title = next_token.content
-            elif cur_token.markup == "##" and author is None:
-                author = re.sub(r"[Bb]y +", "", next_token.content)
-            if title is not None and author is not None:
-                break
+    for fp, (title, author) in zip(piece_paths, found):
         file_errs = []
         if title is None:
             file_errs.append("No title found. Are you missing a # Markdown heading?")
@@ -124,20 +174,54 @@ def get_issue_info(content_path: Path) -> IssueInfo:
     """Get all the needed information about an issue.
 
     :param content_path: Path to where all the content files live.
+    :raises FileNotFoundError: If any of the issue's files other than the cover are
+    missing.
     :return: Issue information.
     """
     content_types = ("story", "poem", "reprint")
-    piece_filenames = [f"{idx+1}a-{content_types[idx % 3]}.md" for idx in range(0, 9)]
 
-    issue_num = get_issue_num(content_path / "0a-about.md")
+    about_path = content_path / "0a-about.md"
     cover_path = content_path / "cover.jpg"
-    description = (content_path / "description.html").read_text(encoding="utf-8")
-    editors = get_editors(content_path / "editors.txt")
-
-    piece_paths = [content_path / fn for fn in piece_filenames]
+    description_path = content_path / "description.html"
+    editors_path = content_path / "editors.txt"
+
+    piece_paths = []
+    piece_kinds = []
+    bio_paths = []
+    avatar_paths = []
+    for num in range(1, 10):
+        kind = content_types[(num - 1) % 3]
+        piece_paths.append(content_path / f"{num}a-{kind}.md")
+        piece_kinds.append(kind)
+        bio_paths.append(content_path / f"{num}b-author.md")
+        avatar_paths.append(content_path / f"{num}-author.jpg")
     piece_post_days = [0, 2, 4, 7, 9, 11, 14, 16, 18]
-    bio_paths = [content_path / f"{idx}b-author.md" for idx in range(1, 10)]
-    avatar_paths = [content_path / f"{idx}-author.jpg" for idx in range(1, 10)]
+
+    # Make sure everything's there before doing any work, rather than failing
+    # partway through building or posting the issue. The cover isn't checked for,
+    # since an issue can be posted without one.
+    with os.scandir(content_path) as entries:
+        existing = {entry.name for entry in entries}
+    missing = [
+        path.name
+        for path in (
+            about_path,
+            description_path,
+            editors_path,
+            *piece_paths,
+            *bio_paths,
+            *avatar_paths,
+        )
+        if path.name not in existing
+    ]
+    if missing:
+        raise FileNotFoundError(
+            f"Missing files in {content_path}:\n  " + "\n  ".join(missing)
+        )
+
+    issue_num = get_issue_num(about_path)
+    description = read_text(description_path)
+    editors = get_editors(editors_path)
     titles, authors = get_titles_and_authors(piece_paths)
 
     return IssueInfo(
@@ -146,6 +230,7 @@ def get_issue_info(content_path: Path) -> IssueInfo:
         description=description,
         editors=editors,
         piece_paths=piece_paths,
+        piece_kinds=piece_kinds,
         piece_post_days=piece_post_days,
         titles=titles,
         bio_paths=bio_paths,
@@ -1,13 +1,25 @@
+import base64
+import os
+import threading
+import time
 import tomllib
+from collections.abc import Callable, Iterable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
-from datetime import date, datetime, timedelta
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
 from enum import StrEnum, auto
+from functools import lru_cache
+from json import dumps, loads
 from pathlib import Path
 from urllib.parse import urljoin
+from zoneinfo import ZoneInfo
 
 import click
-import pytz
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 from issue_info import IssueInfo, get_issue_info
 from renderers import (
@@ -17,6 +29,8 @@ from renderers import (
     title_to_slug,
 )
 
+_MODULE_DIR = Path(__file__).parent
+
 
 class REST(StrEnum):
     GET = auto()
@@ -26,16 +40,13 @@ class REST(StrEnum):
 
 class NAMESPACES(StrEnum):
     WP = "wp/v2/"
+    BATCH = "batch/"
     JWT = "jwt-auth/v1"
     RML = "realmedialibrary/v1/"
 
 
 # TODO REMOVE AFTER TESTING
 VERIFY = False
-
-import urllib3
-
-urllib3.disable_warnings()
 # TODO END REMOVE AFTER TESTING
 
 
@@ -111,25 +122,23 @@ def check_response(r: requests.Response, task_desc: str | None = None) -> None:
     :param r: Response object from a requests call.
     :param task_desc: Optional description of the task being performed.
     """
-    http_error_msg = ""
+    if 400 <= r.status_code < 500:
+        kind = "Client"
+    elif 500 <= r.status_code < 600:
+        kind = "Server"
+    else:
+        return
+
     if task_desc is None:
         task_desc = ""
     else:
         task_desc = f"Error {task_desc}. "
+    # Only work out the reason for errors, since it can mean parsing the whole body
     reason = response_reason(r)
-
-    if 400 <= r.status_code < 500:
-        http_error_msg = (
-            f"{task_desc}{r.status_code} Client Error: {reason} for url: {r.url}"
-        )
-
-    elif 500 <= r.status_code < 600:
-        http_error_msg = (
-            f"{task_desc}{r.status_code} Server Error: {reason} for url: {r.url}"
-        )
-
-    if http_error_msg:
-        raise requests.HTTPError(http_error_msg, response=r)
+    raise requests.HTTPError(
+        f"{task_desc}{r.status_code} {kind} Error: {reason} for url: {r.url}",
+        response=r,
+    )
 
 
 def get_token(username: str, password: str) -> str:
@@ -141,8 +150,12 @@ def get_token(username: str, password: str) -> str:
     :raises HTTPError: If the token can't be fetched.
     """
     rest_endpoint = wp_rest_url("token", NAMESPACES.JWT)
-    resp = requests.post(
-        rest_endpoint, json={"username": username, "password": password}, verify=VERIFY
+    # Leave out the session's token, which is stale if we're asking for a new one.
+    # It stays on the session itself so other threads can use it in the meantime.
+    resp = session.post(
+        rest_endpoint,
+        json={"username": username, "password": password},
+        headers={"Authorization": None},
     )
     if resp.status_code != 200:
         raise requests.HTTPError(
@@ -153,35 +166,62 @@ def get_token(username: str, password: str) -> str:
     return j["token"]
 
 
-host_info: dict[str, str | None] = None
+@dataclass(slots=True)
+class HostInfo:
+    """Information about the host and how to log in to it"""
+
+    host: str
+    username: str | None = None
+    password: str | None = None
+    use_2fa: bool | None = None
+
+
+host_info: HostInfo = None
 """Information about the host."""
 
+session: requests.Session = None
+"""HTTP session for all requests to the host, so connections get reused."""
+
 current_token: str = None
 """JSON Web Token for authentication."""
 
+token_expiration_time: int | None = None
+"""When current_token expires, in seconds since the epoch, or None if unknown."""
+
+_token_lock = threading.Lock()
+
 rml_folders: dict[str, int] = None
 """Real Media Library folders' names and their corresponding IDs."""
 
+token_cache_path = Path.home() / ".cache" / "swepub" / "token.json"
+"""Where our JWT is saved between runs."""
+
 
 def setup_host_info(config_file: Path = Path("issue_config.toml")) -> None:
     """Gets host info from a config file and the user and saves it in host_info.
 
-    Host info is first loaded from a config file. The user is prompted for missing info.
+    Host info is first loaded from a config file. If the config file doesn't have the
+    password, it's taken from the SWEPUB_WP_PASSWORD environment variable. The user is
+    prompted for missing info. Does nothing if host info has already been set up.
 
     :param file: Config file to load, defaults to Path("issue_config.toml")
     """
     global host_info
 
+    if host_info is not None:
+        return
+
     if not config_file.is_absolute():
-        config_file = Path(__file__).parent / config_file
+        config_file = _MODULE_DIR / config_file
     try:
-        defaults = tomllib.loads(config_file.read_text("utf-8"))
+        with config_file.open("rb") as f:
+            defaults = tomllib.load(f)
     except tomllib.TOMLDecodeError as e:
         click.echo(f"Couldn't open config file {config_file}. {e}")
         defaults = {}
     host = defaults.get("host", None)
     username = defaults.get("username", None)
-    password = defaults.get("password", None)
+    password = defaults.get("password", os.environ.get("SWEPUB_WP_PASSWORD"))
     use_2fa = defaults.get("use_2fa", None)
     if host is None:
         host = click.prompt("Enter the URL to your WordPress site", type=str)
@@ -189,51 +229,169 @@ def setup_host_info(config_file: Path = Path("issue_config.toml")) -> None:
         username = click.prompt("Enter your WordPress username", type=str)
     if password is None:
         password = click.prompt("Enter your WordPress password", type=str)
-    host_info = {
-        "host": host,
-        "username": username,
-        "password": password,
-        "use_2fa": use_2fa,
+    host_info = HostInfo(
+        host=host, username=username, password=password, use_2fa=use_2fa
+    )
+
+
+def setup_session() -> None:
+    """Set up the HTTP session used to talk to the host."""
+    global session
+
+    session = requests.Session()
+    session.verify = VERIFY
+    if not VERIFY:
+        # Don't warn about every single unverified request
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    session.headers["Accept"] = "application/json"
+    # Only idempotent requests are retried, so a failed POST won't get repeated
+    retries = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def token_expiration(token: str) -> int | None:
+    """Get when a JWT expires.
+
+    :param token: JSON Web Token.
+    :return: Expiration time in seconds since the epoch, or None if the token doesn't say.
+    """
+    try:
+        payload = token.split(".")[1]
+        # JWTs leave off the base64 padding
+        claims = loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        return int(claims["exp"])
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None
+
+
+def load_cached_token() -> str | None:
+    """Load the JWT saved from a previous run.
+
+    :return: The token, or None if there isn't one for the current host and user that has
+    at least a minute left before it expires.
+    """
+    try:
+        cached = loads(token_cache_path.read_text("utf-8"))
+        if (
+            cached["host"] != host_info.host
+            or cached["username"] != host_info.username
+            or cached["exp"] - time.time() < 60
+        ):
+            return None
+        return cached["token"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_cached_token(token: str) -> None:
+    """Save a JWT for use by later runs.
+
+    :param token: JSON Web Token.
+    """
+    exp = token_expiration(token)
+    if exp is None:
+        return
+    cached = {
+        "token": token,
+        "exp": exp,
+        "username": host_info.username,
+        "host": host_info.host,
     }
+    try:
+        token_cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # The token grants access to the site, so only we get to read it
+        fd = os.open(token_cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(dumps(cached))
+    except OSError as e:
+        warn(f"Couldn't save the JWT token to {token_cache_path}. {e}")
+
 
+def setup_token(use_cache: bool = True) -> None:
+    """Set up our JWT for authentication.
 
-def setup_token() -> None:
-    """Set up our JWT for authentication."""
-    global current_token
+    If 2FA is on, the code is taken from the SWEPUB_WP_2FA environment variable if it's
+    set. Otherwise the user is prompted for it.
 
-    if host_info["password"] is None:
-        host_info["password"] = click.prompt("Enter your WordPress password", type=str)
-    if host_info["use_2fa"] is True:
-        twofactor = click.prompt("Enter your 2FA code", type=str)
+    :param use_cache: Whether to use the token saved by a previous run if it's still
+    good, defaults to True.
+    """
+    global current_token, token_expiration_time
+
+    if use_cache:
+        token = load_cached_token()
+        if token is not None:
+            token_expiration_time = token_expiration(token)
+            session.headers["Authorization"] = f"Bearer {token}"
+            current_token = token
+            return
+
+    if host_info.password is None:
+        host_info.password = click.prompt("Enter your WordPress password", type=str)
+    if host_info.use_2fa is True:
+        twofactor = os.environ.get("SWEPUB_WP_2FA") or click.prompt(
+            "Enter your 2FA code", type=str
+        )
     else:
         twofactor = ""
 
     while True:
         try:
-            current_token = get_token(
-                host_info["username"],
-                host_info["password"] + twofactor,
+            token = get_token(
+                host_info.username,
+                host_info.password + twofactor,
             )
             break
         except requests.HTTPError as e:
             code = response_jwt_error(e.response)
             if code == "invalid_username":
-                host_info["username"] = click.prompt(
-                    f"Invalid username {host_info['username']}. Enter your WordPress username",
+                host_info.username = click.prompt(
+                    f"Invalid username {host_info.username}. Enter your WordPress username",
                     type=str,
                 )
             elif code == "incorrect_password":
-                warn(f"Failed to authenticate user {host_info['username']}")
-                host_info["password"] = click.prompt(
-                    f"Wrong password for user {host_info['username']}. Enter your WordPress password",
+                warn(f"Failed to authenticate user {host_info.username}")
+                host_info.password = click.prompt(
+                    f"Wrong password for user {host_info.username}. Enter your WordPress password",
                     type=str,
                 )
             elif code == "wfls_twofactor_required":
-                host_info["use_2fa"] = True
-                twofactor = click.prompt("Enter your 2FA code", type=str)
+                host_info.use_2fa = True
+                # Only fall back to the environment's code if it hasn't been tried yet
+                env_twofactor = os.environ.get("SWEPUB_WP_2FA")
+                if env_twofactor and twofactor != env_twofactor:
+                    twofactor = env_twofactor
+                else:
+                    twofactor = click.prompt("Enter your 2FA code", type=str)
             else:
                 raise
 
+    token_expiration_time = token_expiration(token)
+    save_cached_token(token)
+    # Swap in the new token on the session before publishing it, so any thread that
+    # sees the new current_token also sends it
+    session.headers["Authorization"] = f"Bearer {token}"
+    current_token = token
+
+
+def refresh_token(stale_token: str) -> None:
+    """Replace a stale JWT with a new one.
+
+    When several threads find the same stale token, only the first one gets a new token.
+
+    :param stale_token: The token that's expired or about to.
+    """
+    with _token_lock:
+        if current_token == stale_token:
+            setup_token(use_cache=False)
+
 
 def setup_rml_folders() -> None:
     """Set up information about Real Media Library folders on the WP site."""
@@ -247,7 +405,7 @@ def setup_rml_folders() -> None:
     )
     if r.status_code == 200:
         rml_folders = {
-            folder["name"].lower(): folder["id"] for folder in r.json()["tree"]
+            folder["name"].lower(): int(folder["id"]) for folder in r.json()["tree"]
         }
     elif r.status_code == 404:
         warn("No Real Media Library folders found on the site")
@@ -256,21 +414,12 @@ def setup_rml_folders() -> None:
         check_response(r, "getting information about Real Media Library folders")
 
 
-def get_wp_headers(headers: dict[str, str] | None = None) -> None:
-    """Get headers for communicating with WordPress, including our JWT.
-
-    Requires current_token to be set up.
-
-    :param headers: Headers to add WP headers to, defaults to None
-    :return: Full headers
-    """
-    global current_token
-
-    if headers is None:
-        headers = {}
-
-    headers["Authorization"] = f"Bearer {current_token}"
-    return headers
+@lru_cache
+def _rest_namespace_url(host: str, namespace: str) -> str:
+    """Get the URL to a REST namespace, which only needs working out once per host."""
+    if namespace[-1] != "/":
+        namespace += "/"
+    return urljoin(urljoin(host, "wp-json/"), namespace)
 
 
 def wp_rest_url(endpoint: str, namespace: str = NAMESPACES.WP) -> str:
@@ -282,11 +431,7 @@ def wp_rest_url(endpoint: str, namespace: str = NAMESPACES.WP) -> str:
     :param namespace: Namespace for the endpoint.
     :return: The full URL to the REST endpoint.
     """
-    if namespace[-1] != "/":
-        namespace += "/"
-    if endpoint[0] == "/":
-        endpoint = endpoint[1:]
-    return urljoin(urljoin(urljoin(host_info["host"], "wp-json/"), namespace), endpoint)
+    return _rest_namespace_url(host_info.host, namespace) + endpoint.lstrip("/")
 
 
 def wp_request(
@@ -302,38 +447,50 @@ def wp_request(
 ) -> requests.Response:
     """Perform a REST request to a WordPress site.
 
+    The session must be set up with our JWT before calling this function.
+
     :param verb: Type of request to perform.
     :param endpoint: REST endpoint to get.
     :param task_desc: Description of the task being performed, defaults to None.
     :param params: Additional request parameters, defaults to None
-    :param data: Data to send in the body, defaults to None.
+    :param data: Data to send in the body, which can be a file opened in binary mode,
+    defaults to None.
     :param json: JSON-izeable object to send in the body, defaults to None.
     :param headers: Headers for the request, defaults to None.
     :param rest_namespace: Namespace for the REST request, or None to use the default.
     :return: Response
     """
-    h = get_wp_headers(headers)
     if rest_namespace:
         full_endpoint = wp_rest_url(endpoint, rest_namespace)
     else:
         full_endpoint = wp_rest_url(endpoint)
+    if json is not None:
+        # Serialize the body once, instead of again if the request has to be retried
+        data = dumps(json, allow_nan=False).encode()
+        headers = {**(headers or {}), "Content-Type": "application/json"}
+
+    # Get a new token shortly before the current one runs out, rather than
+    # waiting for a request to be turned away
+    if token_expiration_time is not None and time.time() > token_expiration_time - 30:
+        refresh_token(current_token)
 
     while True:
-        r = requests.request(
+        sent_token = current_token
+        r = session.request(
             verb,
             full_endpoint,
-            headers=h,
+            headers=headers,
             params=params,
             data=data,
-            json=json,
-            verify=VERIFY,
         )
         if r.status_code == 403:
             code = response_jwt_error(r)
             if code == "jwt_auth_invalid_token":
                 warn("JWT token has expired. Getting a new one.")
-                setup_token()
-                h = get_wp_headers(headers)
+                refresh_token(sent_token)
+                # A file being sent as the body has to be re-sent from the start
+                with suppress(AttributeError):
+                    data.seek(0)
                 continue
         check_response(r, task_desc)
         break
@@ -341,88 +498,163 @@ def wp_request(
     return r
 
 
+_BATCH_MAX_REQUESTS = 25
+"""Most requests the WP batch endpoint will accept at once."""
+
+
+def wp_batch(
+    batch: Sequence[tuple[REST, str, dict]], task_desc: str | None = None
+) -> list[dict]:
+    """Perform several REST requests to a WordPress site in as few round trips as possible.
+
+    Uses WordPress's batch endpoint, which only works for endpoints that allow
+    batching, such as posts. Requests are validated together, so if any of them
+    is invalid, none of them are performed. Sites that lack the batch endpoint
+    (WordPress before 5.6) get the requests one at a time instead.
+
+    :param batch: Requests to perform as (verb, endpoint, JSON-izeable body) tuples.
+    Endpoints are in the default namespace.
+    :param task_desc: Description of the task being performed, defaults to None.
+    :raises requests.HTTPError: If any of the requests fail.
+    :return: The JSON body of each request's response.
+    """
+    bodies = []
+    for start in range(0, len(batch), _BATCH_MAX_REQUESTS):
+        sub_requests = [
+            {
+                "method": verb.upper(),
+                "path": f"/{NAMESPACES.WP}{endpoint}",
+                "body": body,
+            }
+            for verb, endpoint, body in batch[start : start + _BATCH_MAX_REQUESTS]
+        ]
+        try:
+            r = wp_request(
+                REST.POST,
+                "v1",
+                task_desc,
+                json={"requests": sub_requests, "validation": "require-all-validate"},
+                rest_namespace=NAMESPACES.BATCH,
+            )
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
+            warn("The site doesn't support batch requests. Sending them one by one.")
+            return bodies + [
+                wp_request(verb, endpoint, task_desc, json=body).json()
+                for verb, endpoint, body in batch[start:]
+            ]
+        for resp in r.json()["responses"]:
+            # With require-all-validate, a validation failure leaves no body for
+            # the requests that were fine, only for the ones that failed
+            if resp is None:
+                continue
+            if resp["status"] >= 400:
+                task = "" if task_desc is None else f"Error {task_desc}. "
+                raise requests.HTTPError(
+                    f"{task}{resp['status']} error in batch request: {resp['body'].get('message')} for url: {r.url}",
+                    response=r,
+                )
+            bodies.append(resp["body"])
+
+    return bodies
+
+
+_RELEASE_TZ = ZoneInfo("America/Chicago")
+"""Time zone that issues are released in."""
+
+
 def issue_release_time(year_month: date | None = None) -> datetime:
     """Get the release time for an issue.
 
     Issues are released on the first Monday of a month at 11:00 am CDT.
 
     :param year_month: Year and month to release the issue. If None, it's automatically set to the month following the current one.
-    :return: The next month's first Monday.
+    :return: The next month's first Monday, as a naive datetime in UTC.
     """
     # Start with the first day of the month
-    dt = datetime.utcnow().replace(day=1, hour=11, minute=0, second=0, microsecond=0)
+    dt = datetime.now(_RELEASE_TZ).replace(
+        day=1, hour=11, minute=0, second=0, microsecond=0
+    )
     if year_month is not None:
         dt = dt.replace(year=year_month.year, month=year_month.month)
+    elif dt.month == 12:
+        # Skip forward to next month
+        dt = dt.replace(year=dt.year + 1, month=1)
     else:
-        # Skip forward to the first day of next month
-        dt = (dt + timedelta(days=32)).replace(day=1)
+        dt = dt.replace(month=dt.month + 1)
 
-    # Now move to the first Monday and adjust the timezone
-    tz_delta = pytz.timezone("America/Chicago").utcoffset(dt)
-    # If we're already on a Monday, don't skip forward
-    if dt.weekday() != 0:
-        dt += timedelta(days=7 - dt.weekday())
-    dt -= tz_delta
+    # Now move to the first Monday. If we're already on a Monday, don't skip forward
+    dt += timedelta(days=-dt.weekday() % 7)
 
-    return dt
+    # The offset from UTC is looked up for the Monday itself, so it's right on either
+    # side of a Daylight Saving Time change
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
 
 
-def get_existing_wp_object(
+# Post-like endpoints, whose objects may be published or future-scheduled
+_POST_LIKE_ENDPOINTS = ("post", "piece", "issue")
+
+
+def _query_existing_wp_objects(
     obj_name: str, endpoint: str, search: str | None = None, slug: str | None = None
-) -> int | None:
-    """See if a WP object exists and, if so, get its ID.
+) -> tuple[dict, list[dict]]:
+    """Ask WP for the objects matching a search and/or slug.
 
     :param obj_name: Descriptive name of the object, like "cover".
     :param endpoint: WP REST endpoint to query.
     :param search: String to search for, defaults to None.
     :param slug: Slug to search for, defaults to None.
-    :raise RuntimeError: If more than one object is found.
-    :return: ID if found, or None if not.
+    :return: Tuple of the parameters that were searched for and the matching objects.
     """
-    obj_id = None
     params = {}
     if search:
         params["search"] = search
     if slug:
         params["slug"] = slug
-    # Post-like endpoints may be published or future-scheduled
-    if endpoint in ["post", "piece", "issue"]:
+    if endpoint in _POST_LIKE_ENDPOINTS:
         params["status"] = "publish,future"
     resp = wp_request(
         REST.GET,
         endpoint,
         f"checking for an existing {obj_name}",
-        params=params,
+        # Only ask for the fields we use to keep the response small
+        params={**params, "_fields": "id,title,name"},
     )
-    json = resp.json()
+    return params, resp.json()
+
+
+def _pick_existing_wp_object(
+    obj_name: str, params: dict, json: list[dict]
+) -> int | None:
+    """Get the ID of the one WP object that matched a query.
+
+    :param obj_name: Descriptive name of the object, like "cover".
+    :param params: Parameters that were searched for.
+    :param json: The matching objects.
+    :return: ID if found, or None if not. If more than one object was found, the user
+    picks which one is right, or none of them.
+    """
+    obj_id = None
     if json:
         if len(json) > 1:
-            if len(json) > 9:
-                raise NotImplementedError(
-                    f"Found {len(json)} existing {obj_name}s, but we're only set up to handle at most 9"
-                )
             warn(
                 f"When looking for an existing {obj_name}, we found multiple ones "
                 f"with the parameters {params}:\n"
             )
+            # Posts have titles, while terms like authors have names
             click.echo(
                 "\n".join(
                     [
-                        f"{ndx+1}: {obj['title']['rendered']} (id {obj['id']})"
+                        f"{ndx+1}: {obj['title']['rendered'] if 'title' in obj else obj.get('name')} (id {obj['id']})"
                         for ndx, obj in enumerate(json)
                     ]
                 )
             )
-            c = None
-            while c is None:
-                try:
-                    click.echo(
-                        "Enter the correct author by number, or 0 if none of them are the right match."
-                    )
-                    c = int(click.getchar())
-                except ValueError:
-                    click.echo(f"{c} isn't a valid number")
-                    c = None
+            c = click.prompt(
+                f"Enter the correct {obj_name} by number, or 0 if none of them are the right match",
+                type=click.IntRange(0, len(json)),
+            )
 
             if c > 0:
                 obj_id = json[c - 1]["id"]
@@ -435,6 +667,92 @@ def get_existing_wp_object(
     return obj_id
 
 
+def get_existing_wp_object(
+    obj_name: str, endpoint: str, search: str | None = None, slug: str | None = None
+) -> int | None:
+    """See if a WP object exists and, if so, get its ID.
+
+    :param obj_name: Descriptive name of the object, like "cover".
+    :param endpoint: WP REST endpoint to query.
+    :param search: String to search for, defaults to None.
+    :param slug: Slug to search for, defaults to None.
+    :return: ID if found, or None if not. If more than one object is found, the user
+    picks which one is right, or none of them.
+    """
+    return _pick_existing_wp_object(
+        obj_name, *_query_existing_wp_objects(obj_name, endpoint, search, slug)
+    )
+
+
+def get_existing_wp_objects_by_search(
+    obj_name: str,
+    endpoint: str,
+    searches: Iterable[str],
+    announce: Callable[[str], None] | None = None,
+) -> dict[str, int | None]:
+    """See which of several WP objects exist and get their IDs.
+
+    WP can only search for one string at a time, so the searches are sent in
+    parallel. Their results are then gone through one at a time, in order, since
+    finding more than one match means asking the user which is right.
+
+    :param obj_name: Descriptive name of the objects, like "author".
+    :param endpoint: WP REST endpoint to query.
+    :param searches: Strings to search for.
+    :param announce: Function to call with each search string before its result is
+    gone through, defaults to None.
+    :return: Dictionary of the search strings and the IDs found for them, or None
+    for ones that weren't found.
+    """
+    searches = list(dict.fromkeys(searches))
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        found = list(
+            executor.map(
+                lambda search: _query_existing_wp_objects(
+                    obj_name, endpoint, search=search
+                ),
+                searches,
+            )
+        )
+    ids = {}
+    for search, (params, json) in zip(searches, found):
+        if announce is not None:
+            announce(search)
+        ids[search] = _pick_existing_wp_object(obj_name, params, json)
+    return ids
+
+
+def get_existing_wp_objects_by_slug(
+    obj_name: str, endpoint: str, slugs: Sequence[str]
+) -> dict[str, int]:
+    """See which of several WP objects exist and get their IDs, all in one request.
+
+    :param obj_name: Descriptive name of the objects, like "piece".
+    :param endpoint: WP REST endpoint to query.
+    :param slugs: Slugs to look for. At most 100 are supported.
+    :return: Dictionary of the slugs that were found and their IDs.
+    """
+    params = {"slug": ",".join(slugs), "per_page": 100, "_fields": "id,slug"}
+    if endpoint in _POST_LIKE_ENDPOINTS:
+        params["status"] = "publish,future"
+    resp = wp_request(
+        REST.GET,
+        endpoint,
+        f"checking for existing {obj_name}s",
+        params=params,
+    )
+    ids = {}
+    for obj in resp.json():
+        if obj["slug"] in ids:
+            warn(
+                f"Found multiple existing {obj_name}s with the slug {obj['slug']}. "
+                f"Using the one with id {ids[obj['slug']]}."
+            )
+        else:
+            ids[obj["slug"]] = obj["id"]
+    return ids
+
+
 def upload_image(
     img: Path,
     filename: str | None = None,
@@ -453,63 +771,57 @@ def upload_image(
     """
     if filename is None:
         filename = img.name
-    img_bytes = img.read_bytes()
 
     headers = {
         "Content-Type": "image/jpeg",
         "Accept": "application/json",
         "Content-Disposition": f"attachment; filename={filename}",
+        "Content-Length": str(img.stat().st_size),
     }
-    resp = wp_request(
-        REST.POST,
-        "media",
-        "uploading an image",
-        data=img_bytes,
-        headers=headers,
-    )
-
-    img_id = int(resp.json()["id"])
-
-    if title or alt_text or slug:
-        post_info = {}
-        if title:
-            post_info["title"] = title
-        if alt_text:
-            post_info["alt_text"] = alt_text
-        if slug:
-            post_info["slug"] = slug
+    # The body is the image itself, so the metadata rides along as parameters
+    # rather than needing a second request to add it
+    params = {}
+    if title:
+        params["title"] = title
+    if alt_text:
+        params["alt_text"] = alt_text
+    if slug:
+        params["slug"] = slug
+    # Stream the image from the file rather than reading it all into memory first
+    with img.open("rb") as f:
         resp = wp_request(
             REST.POST,
-            f"media/{img_id}",
-            "updating the image metadata",
-            json=post_info,
+            "media",
+            "uploading an image",
+            params=params,
+            data=f,
+            headers=headers,
         )
 
-    return img_id
+    return int(resp.json()["id"])
 
 
-def move_image_to_rml_folder(id: int, folder: str) -> None:
-    """Move an image on the WP site to a Real Media Library folder.
+def move_images_to_rml_folder(ids: Sequence[int], folder: str) -> None:
+    """Move images on the WP site to a Real Media Library folder in one request.
 
     Prints a warning if the folder doesn't exist.
 
-    :param id: ID of the uploaded media.
-    :param folder: Name of the folder to move it to.
+    :param ids: IDs of the uploaded media.
+    :param folder: Name of the folder to move them to. Case doesn't matter.
     """
-    cover_folder_id = rml_folders.get(folder, None)
-    if cover_folder_id is None:
+    folder_id = rml_folders.get(folder.lower(), None)
+    if folder_id is None:
         warn(
-            f"No folder '{folder}' found in the site's Real Media Library. Available folders: {', '.join(rml_folders.keys)}"
+            f"No folder '{folder}' found in the site's Real Media Library. Available folders: {', '.join(rml_folders)}"
         )
     else:
-        r = wp_request(
+        wp_request(
             REST.PUT,
             "attachments/bulk/move",
-            f"moving an image to the Real Media Folder {folder} folder",
-            json={"ids": [id], "to": int(cover_folder_id), "isCopy": False},
+            f"moving images to the Real Media Folder {folder} folder",
+            json={"ids": list(ids), "to": folder_id, "isCopy": False},
             rest_namespace=NAMESPACES.RML,
         )
-        check_response(r)
 
 
 def create_cover(info: IssueInfo) -> int:
@@ -534,13 +846,18 @@ def create_cover(info: IssueInfo) -> int:
                 f"Issue {info.issue_num} cover",
                 slug,
             )
-            move_image_to_rml_folder(cover_id, "covers")
+            move_images_to_rml_folder([cover_id], "covers")
         except FileNotFoundError:
             warn("Cover image not found.")
 
     return cover_id
 
 
+def issue_slug(info: IssueInfo) -> str:
+    """Get the slug for the issue's WP object."""
+    return str(info.issue_num)
+
+
 def create_issue_info(
     info: IssueInfo, cover_id: int | None, post_date: datetime
 ) -> int:
@@ -551,29 +868,22 @@ def create_issue_info(
     :param post_date: The date that the issue will post.
     :return: The WP ID of the issue.
     """
-    title = f"Issue {info.issue_num}"
-    slug = str(info.issue_num)
-
-    issue_id = get_existing_wp_object("issue", "issue", slug=slug)
-    if issue_id is None:
-        click.echo("Creating issue object.")
-        json = {
-            "title": title,
-            "slug": slug,
-            "status": "future",
-            "date_gmt": post_date.isoformat(),
-        }
-        if cover_id is not None:
-            json["featured_media"] = cover_id
-        resp = wp_request(
-            REST.POST,
-            "issue",
-            "creating the issue",
-            json=json,
-        )
-        issue_id = int(resp.json()["id"])
-
-    return issue_id
+    click.echo("Creating issue object.")
+    json = {
+        "title": f"Issue {info.issue_num}",
+        "slug": issue_slug(info),
+        "status": "future",
+        "date_gmt": post_date.isoformat(),
+    }
+    if cover_id is not None:
+        json["featured_media"] = cover_id
+    resp = wp_request(
+        REST.POST,
+        "issue",
+        "creating the issue",
+        json=json,
+    )
+    return int(resp.json()["id"])
 
 
 def create_issue(info: IssueInfo, post_date: datetime) -> int:
@@ -584,117 +894,193 @@ def create_issue(info: IssueInfo, post_date: datetime) -> int:
     :return: ID for the issue.
     """
     subsubheading(f"Creating issue {info.issue_num}")
-    cover_id = create_cover(info)
-    return create_issue_info(info, cover_id, post_date)
+    # Looking for an existing issue doesn't depend on the cover, so do it
+    # while the cover is being checked for and uploaded
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        issue_lookup = executor.submit(
+            get_existing_wp_object, "issue", "issue", slug=issue_slug(info)
+        )
+        cover_id = create_cover(info)
+        issue_id = issue_lookup.result()
+    if issue_id is None:
+        issue_id = create_issue_info(info, cover_id, post_date)
+    return issue_id
 
 
-def create_author_avatar(name: str, avatar_path: Path) -> int:
-    """Create the author's avatar on the WordPress site if it doesn't exist.
+def upload_author_avatar(name: str, avatar_path: Path) -> int:
+    """Upload the author's avatar to the WordPress site.
 
     :param name: The author's name.
     :param avatar_path: Path to the avatar image.
     :return: The WP ID of the avatar image.
     """
-    global rml_folders
+    click.echo(f"Uploading author avatar for {name}.")
+    return upload_image(
+        avatar_path,
+        filename=name.lower().replace(" ", "-") + ".jpg",
+        title=name,
+        alt_text=name,
+    )
 
-    avatar_id = get_existing_wp_object("author avatar", "media", search=name)
-    if avatar_id is None:
-        click.echo(f"Uploading author avatar for {name}.")
-        avatar_id = upload_image(
-            avatar_path,
-            filename=name.lower().replace(" ", "-") + ".jpg",
-            title=name,
-            alt_text=name,
+
+def create_author_avatars(
+    names: Sequence[str], avatar_paths: Sequence[Path]
+) -> dict[str, int]:
+    """Create the authors' avatars on the WordPress site if they don't exist.
+
+    The missing avatars are uploaded in parallel and moved to the headshots folder
+    together.
+
+    :param names: The authors' names.
+    :param avatar_paths: Paths to the authors' avatar images.
+    :return: Dictionary of the authors' names and the WP IDs of their avatar images.
+    """
+    # An author with more than one piece only needs their avatar uploaded once, and
+    # it's the one that goes with their first piece
+    paths = {}
+    for name, avatar_path in zip(names, avatar_paths):
+        paths.setdefault(name, avatar_path)
+    avatar_ids = get_existing_wp_objects_by_search("author avatar", "media", paths)
+    missing = [name for name, avatar_id in avatar_ids.items() if avatar_id is None]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        uploaded = executor.map(
+            lambda name: upload_author_avatar(name, paths[name]), missing
         )
-        move_image_to_rml_folder(avatar_id, "headshots")
+        uploaded = list(uploaded)
+    avatar_ids.update(zip(missing, uploaded))
+    if uploaded:
+        move_images_to_rml_folder(uploaded, "headshots")
 
-    return avatar_id
+    return avatar_ids
 
 
-def create_author(name: str, bio_path: Path, avatar_path: Path) -> int:
-    """Create the WP author object if it doesn't exist.
+def create_new_author(name: str, bio_path: Path, avatar_id: int) -> int:
+    """Create the WP author object.
 
     :param name: Author's name.
     :param bio_path: Path to the author's bio as a Markdown file.
-    :param avatar_path: Path to the author's avatar as a jpeg.
+    :param avatar_id: The WP ID of the author's avatar image.
     :return: Author ID.
     """
-    subsubheading(f"Creating author {name}")
-    avatar_id = create_author_avatar(name, avatar_path)
-    author_id = get_existing_wp_object("author", "ppma_author", search=name)
-    if not author_id:
-        click.echo("Creating author object")
-        resp = wp_request(
-            REST.POST,
-            "ppma_author",
-            "creating the PublishPress author",
-            json={"name": name},
-        )
-        author_id = int(resp.json()["id"])
-        bio = render_author_bio_for_website(bio_path)
-        resp = wp_request(
-            REST.POST,
-            f"ppma_author_meta/{author_id}",
-            "updating author metadata",
-            json={"description": bio, "avatar": avatar_id},
-            rest_namespace="srgcustom/v1/",
+    click.echo(f"Creating author object for {name}")
+    resp = wp_request(
+        REST.POST,
+        "ppma_author",
+        "creating the PublishPress author",
+        json={"name": name},
+    )
+    author_id = int(resp.json()["id"])
+    bio = render_author_bio_for_website(bio_path)
+    wp_request(
+        REST.POST,
+        f"ppma_author_meta/{author_id}",
+        "updating author metadata",
+        json={"description": bio, "avatar": avatar_id},
+        rest_namespace="srgcustom/v1/",
+    )
+    return author_id
+
+
+def create_authors(
+    names: Sequence[str], bio_paths: Sequence[Path], avatar_ids: Mapping[str, int]
+) -> dict[str, int]:
+    """Create the WP author objects if they don't exist.
+
+    The missing authors are created in parallel.
+
+    :param names: Authors' names.
+    :param bio_paths: Paths to the authors' bios as Markdown files.
+    :param avatar_ids: Dictionary of the authors' names and the WP IDs of their avatars.
+    :return: Dictionary of the authors' names and their IDs.
+    """
+    # An author with more than one piece only needs to be created once, using the
+    # bio that goes with their first piece
+    bios = {}
+    for name, bio_path in zip(names, bio_paths):
+        bios.setdefault(name, bio_path)
+    author_ids = get_existing_wp_objects_by_search(
+        "author",
+        "ppma_author",
+        bios,
+        announce=lambda name: subsubheading(f"Creating author {name}"),
+    )
+    missing = [name for name, author_id in author_ids.items() if not author_id]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        created = executor.map(
+            lambda name: create_new_author(name, bios[name], avatar_ids[name]),
+            missing,
         )
+        author_ids.update(zip(missing, created))
 
-    return author_id
+    return author_ids
 
 
-def create_piece(
-    piece_path: Path, post_date: datetime, title: str, author_id: int, issue_id: int
-) -> int:
-    """Create the piece on the WordPress site if it doesn't exist.
+def render_piece_for_website(
+    piece_path: Path, piece_kind: str
+) -> tuple[str, str | None, str | None]:
+    """Render a piece for the WordPress site.
 
     :param piece_path: Path to the markdown file with the piece.
+    :param piece_kind: Kind of piece ("story", "poem", or "reprint").
+    :return: Tuple of the piece's content, where it was originally published, and its
+    original copyright year. The last two are None if not found.
+    """
+    if piece_kind == "poem":
+        return render_poem_for_website(piece_path), None, None
+    return render_story_for_website(piece_path)
+
+
+def get_piece_data(
+    rendered: tuple[str, str | None, str | None],
+    post_date: datetime,
+    title: str,
+    author_id: int,
+    issue_id: int,
+) -> dict:
+    """Get the data needed to create the piece on the WordPress site.
+
+    :param rendered: The rendered piece, as returned by render_piece_for_website().
     :param post_date: When the piece should be posted to the site.
     :param title: Piece title.
     :param author_id: WordPress ID of the piece's author.
     :param issue_id: WordPress ID of the issue the piece belongs to.
-    :return: WordPress ID for the piece.
+    :return: Data for the piece's WP object.
     """
     subsubheading(f"Creating piece object")
-    slug = title_to_slug(title)
-    piece_id = get_existing_wp_object("piece", "piece", slug=slug)
-    if not piece_id:
-        click.echo("Uploading piece")
-        orig_publication = None
-        copyright_year = None
-        if "poem" in str(piece_path):
-            content = render_poem_for_website(piece_path)
-        else:
-            content, orig_publication, copyright_year = render_story_for_website(
-                piece_path
-            )
-        data = {
-            "title": title,
-            "ppma_author": [author_id],
-            "slug": slug,
-            "content": content,
-            "status": "future",
-            "date_gmt": post_date.isoformat(),
-            "sw_piece_parent_issue": issue_id,
-        }
-        if orig_publication:
-            data["sw_piece_previously_published_in"] = orig_publication
-        if copyright_year:
-            data["sw_piece_original_copyright_year"] = copyright_year
-        resp = wp_request(
-            REST.POST,
-            "piece",
-            "posting a piece",
-            data=data,
-        )
-        piece_id = int(resp.json()["id"])
+    content, orig_publication, copyright_year = rendered
+    data = {
+        "title": title,
+        "ppma_author": [author_id],
+        "slug": title_to_slug(title),
+        "content": content,
+        "status": "future",
+        "date_gmt": post_date.isoformat(),
+        "sw_piece_parent_issue": issue_id,
+    }
+    if orig_publication:
+        data["sw_piece_previously_published_in"] = orig_publication
+    if copyright_year:
+        data["sw_piece_original_copyright_year"] = copyright_year
+    return data
+
 
-    return piece_id
+def create_pieces(pieces: Sequence[dict]) -> list[int]:
+    """Create pieces on the WordPress site.
+
+    :param pieces: Data for each piece's WP object.
+    :return: WordPress IDs for the pieces.
+    """
+    click.echo(f"Uploading {len(pieces)} pieces")
+    bodies = wp_batch(
+        [(REST.POST, "piece", data) for data in pieces], "posting the pieces"
+    )
+    return [int(body["id"]) for body in bodies]
 
 
 def setup() -> None:
     """Perform necessary setup steps."""
     setup_host_info()
+    setup_session()
     setup_token()
     setup_rml_folders()
 
@@ -711,43 +1097,72 @@ def setup() -> None:
     type=click.DateTime(["%Y-%m"]),
 )
 def post_issue(content_path: Path | None, release_month: datetime | None) -> None:
-    root_path = Path(__file__).parent
     if not content_path:
-        content_path = root_path / "content"
+        content_path = _MODULE_DIR / "content"
 
-    info = get_issue_info(content_path)
+    issue = get_issue_info(content_path)
 
     if release_month:
         release_month = release_month.date()
     release_date = issue_release_time(release_month)
 
     heading(
-        f"Setting up issue {info.issue_num} to release on {release_date.strftime('%c')}",
+        f"Setting up issue {issue.issue_num} to release on {release_date.strftime('%c')}",
     )
 
     setup()
 
-    issue_id = create_issue(info, release_date)
+    issue_id = create_issue(issue, release_date)
 
     # There's some kind of race condition where uploading an author's
     # avatar and then immediately creating the author object results
     # in an author object w/o an avatar. To avoid that, upload all
     # of the avatars ahead of time.
-    for author_name, avatar_path in zip(info.author_names, info.avatar_paths):
-        create_author_avatar(author_name, avatar_path)
-
-    for (
-        piece_path,
-        post_day,
-        title,
-        bio_path,
-        author_name,
-        avatar_path,
-    ) in info.piece_info():
-        subheading(f'\nCreating piece "{title}"')
-        post_date = release_date + timedelta(days=post_day)
-        author_id = create_author(author_name, bio_path, avatar_path)
-        piece_id = create_piece(piece_path, post_date, title, author_id, issue_id)
+    avatar_ids = create_author_avatars(issue.author_names, issue.avatar_paths)
+
+    # Look for all of the pieces at once, and gather up the new ones so they
+    # can be posted together
+    existing_piece_ids = get_existing_wp_objects_by_slug(
+        "piece", "piece", [title_to_slug(title) for title in issue.titles]
+    )
+    new_pieces = []
+    # Render the new pieces while their authors are being set up
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        renders = {
+            piece_path: executor.submit(
+                render_piece_for_website, piece_path, piece_kind
+            )
+            for piece_path, piece_kind, title in zip(
+                issue.piece_paths, issue.piece_kinds, issue.titles
+            )
+            if title_to_slug(title) not in existing_piece_ids
+        }
+        author_ids = create_authors(issue.author_names, issue.bio_paths, avatar_ids)
+        for (
+            piece_path,
+            piece_kind,
+            post_day,
+            title,
+            bio_path,
+            author_name,
+            avatar_path,
+        ) in issue.piece_info():
+            subheading(f'\nCreating piece "{title}"')
+            piece_id = existing_piece_ids.get(title_to_slug(title))
+            if piece_id is not None:
+                info(f"Piece has already been created (id {piece_id}); skipping.")
+                continue
+            new_pieces.append(
+                get_piece_data(
+                    renders[piece_path].result(),
+                    release_date + timedelta(days=post_day),
+                    title,
+                    author_ids[author_name],
+                    issue_id,
+                )
+            )
+    if new_pieces:
+        create_pieces(new_pieces)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,95 @@
 import re
 from collections.abc import Callable
-from contextlib import suppress
-from itertools import accumulate
+from functools import lru_cache
 from pathlib import Path
 
 from markdown_it import MarkdownIt
 
+from file_cache import read_lines, read_text
+
 _ebook_md = MarkdownIt("commonmark", {"typographer": True})
 _ebook_md.enable(["replacements", "smartquotes"])
 _website_md = MarkdownIt("commonmark", {"typographer": True})
 _website_md.enable(["replacements"])
+# Stories get Gutenberg block wrappers around various tags
+_website_story_md = MarkdownIt("commonmark", {"typographer": True})
+_website_story_md.enable(["replacements"])
+_website_story_md.add_render_rule(
+    "paragraph_open", lambda *args, **kwargs: "<!-- wp:paragraph -->\n<p>"
+)
+_website_story_md.add_render_rule(
+    "paragraph_close",
+    lambda *args, **kwargs: "</p>\n<!-- /wp:paragraph -->\n\n",
+)
+_website_story_md.add_render_rule(
+    "hr",
+    lambda *args, **kwargs: (
+        "<!-- wp:separator -->\n"
+        '<hr class="wp-block-separator has-alpha-channel=opacity scene-break">\n'
+        "<!-- /wp:separator -->\n\n"
+    ),
+)
+
+
+# A horizontal rule written as raw HTML, like <hr> or <hr />
+_RAW_RULE_RE = re.compile(r"<hr\s*/?>")
+
+
+def _is_rule(token) -> bool:
+    """Whether a token is a horizontal rule, either from Markdown or raw HTML."""
+    return token.type == "hr" or (
+        token.type == "html_block"
+        and _RAW_RULE_RE.fullmatch(token.content.strip()) is not None
+    )
+
+
+def _is_rule_before_paragraph(tokens, idx: int) -> bool:
+    """Whether the token at idx is a horizontal rule directly followed by a paragraph."""
+    return (
+        _is_rule(tokens[idx])
+        and idx + 1 < len(tokens)
+        and tokens[idx + 1].type == "paragraph_open"
+    )
+
+
+def _ebook_story_rule(self, tokens, idx, options, env):
+    # A rule before a paragraph turns into that paragraph being unindented instead
+    if _is_rule_before_paragraph(tokens, idx):
+        return ""
+    if tokens[idx].type == "html_block":
+        return tokens[idx].content
+    return self.renderToken(tokens, idx, options, env)
+
+
+def _ebook_story_paragraph_open(self, tokens, idx, options, env):
+    if idx and _is_rule_before_paragraph(tokens, idx - 1):
+        return '<p class="noindent">'
+    return self.renderToken(tokens, idx, options, env)
+
+
+# Ebook stories show scene breaks by not indenting the paragraph after them
+_ebook_story_md = MarkdownIt("commonmark", {"typographer": True})
+_ebook_story_md.enable(["replacements", "smartquotes"])
+_ebook_story_md.add_render_rule("hr", _ebook_story_rule)
+_ebook_story_md.add_render_rule("html_block", _ebook_story_rule)
+_ebook_story_md.add_render_rule("paragraph_open", _ebook_story_paragraph_open)
+
+# Headers only start at the beginning of a line; a "#" mid-line is just text
+_HEADER_MD_RE = re.compile(r"^#+[^#].*\n*", re.MULTILINE)
+_FIRST_PUBLISHED_RE = re.compile("First published in (.*)\n*")
+_COPYRIGHT_RE = re.compile(r"Copyright (\(c\)|©) (\d+).+\n*")
+_NON_SLUG_RE = re.compile(r"[^- \w]")
+# CommonMark thematic break, i.e. a line that renders as a horizontal rule
+_THEMATIC_BREAK_RE = re.compile(r" {0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*")
+
+
+def render_markdown_for_ebook(text: str) -> str:
+    """Generate the ebook HTML for general Markdown, such as front matter or bios.
+
+    :param text: Markdown to render.
+    :return: HTML for the Markdown.
+    """
+    return _ebook_md.render(text)
 
 
 def render_story_for_ebook(p: Path) -> str:
@@ -18,91 +98,100 @@ def render_story_for_ebook(p: Path) -> str:
     :param path: Path to the story's markdown file.
     :return: HTML for the story.
     """
-    raw_html = _ebook_md.render(p.read_text(encoding="utf-8"))
-    # Change <hr><p> into <p class="noindent"> the funky regex way
-    # since lxml's HTML parser requires fragments have a single parent
-    # (i.e. lxml wants to wrap the output of md.render() in a single div tag)
-    raw_html = re.sub("<hr( /)?>\n*<p>", '<p class="noindent">', raw_html)
+    return _ebook_story_md.render(read_text(p))
+
 
-    return raw_html
+# Poem line classes, indexed by how many tabs the line is indented
+_POEM_TAB_CLASSES = ("poem", "poem tab1", "poem tab2", "poem tab3", "poem tab4")
 
 
+@lru_cache(maxsize=1024)
 def _poem_line_to_ebook_html(line: str) -> str:
     """Wrap a poem's line in HTML for an ebook.
 
+    Poems repeat blank lines, refrains, and the like, so the results are cached.
+
     :param line: Line from the poem.
     :return: HTML-ized poem line
     """
     classes = "poem"
-    if not line.strip():
+    if not line or line.isspace():
         # Non-breaking space needed to force ereaders to honor blank lines
         md_line = "&nbsp;"
     else:
-        if line.startswith("\t"):
-            cnt = len(re.match("\t+", line).group(0))
-            if cnt > 5:
-                raise RuntimeError(f"Too many tabs {cnt} in line {line}")
-            classes += f" tab{cnt}"
-            line = line[cnt:]
-        md_line = _ebook_md.renderInline(line)
+        stripped = line.lstrip("\t")
+        cnt = len(line) - len(stripped)
+        if cnt >= len(_POEM_TAB_CLASSES):
+            raise RuntimeError(f"Too many tabs {cnt} in line {line}")
+        classes = _POEM_TAB_CLASSES[cnt]
+        md_line = _ebook_md.renderInline(stripped)
 
     return f'<div class="{classes}">{md_line}</div>\n'
 
 
-# The poem HTML gets wrapped in a lazyblocks Gutenberg block, which requires that < and >
-# get turned into Unicode characters.
-poem_trans = str.maketrans({"<": "\\u003c", ">": "\\u003e", '"': "\\u0022"})
-
-
+@lru_cache(maxsize=1024)
 def _poem_line_to_website_html(line: str) -> str:
     """Wrap a poem's line in HTML for the website.
 
     :param line: Line from the poem.
     :return: HTML-ized poem line
     """
-    md_line = _website_md.renderInline(line)
-    md_line = md_line.replace("\t", "-> ") + "<br>"
-    return md_line.translate(poem_trans)
+    md_line = _website_md.renderInline(line) + "<br>"
+    # The poem HTML gets wrapped in a lazyblocks Gutenberg block, which requires that
+    # < and > get turned into Unicode characters. Tabs become arrows with a pre-escaped >.
+    # Chained replaces beat str.translate with a dict for this handful of characters.
+    return (
+        md_line.replace("\t", "-\\u003e ")
+        .replace("<", "\\u003c")
+        .replace(">", "\\u003e")
+        .replace('"', "\\u0022")
+    )
 
 
 def _render_poem(
-    p: Path, md: MarkdownIt, poem_line_to_html: Callable[[str], str]
+    p: Path,
+    md: MarkdownIt,
+    poem_line_to_html: Callable[[str], str],
+    honor_rules: bool = True,
 ) -> tuple[str, str]:
     """Generate the HTML for a poem.
 
     :param p: Path to the poem's markdown file.
     :param md: Markdown parsing/rendering object.
     :param poem_line_to_html: Function to turn a single line into HTML.
+    :param honor_rules: Whether to turn horizontal rules into <hr /> tags rather
+    than treating them like any other line.
     :return: HTML for the poem's header and contents in a tuple.
     """
     # Since poems need specialized formatting, we handle them on a line-by-line basis
-    header_html = ""
-    body_html = ""
-    lines = p.read_text(encoding="utf-8").splitlines()
+    header_parts = []
+    body_parts = []
+    lines = read_lines(p)
     in_content = False
     for line in lines:
         if not in_content:
-            if not line.strip():
+            if not line or line.isspace():
                 continue
-            m = re.match("#+", line)
-            if m is None:
+            cnt = len(line) - len(line.lstrip("#"))
+            if not cnt:
                 in_content = True
             else:
-                hashes = m.group(0)
-                cnt = len(hashes)
                 if cnt > 6:
                     raise RuntimeError(f"Too many hash marks ({cnt})) in line {line}")
-                header_html += f"<h{cnt}>{md.renderInline(line[cnt:])}</h{cnt}>\n\n"
+                header_parts.append(
+                    f"<h{cnt}>{md.renderInline(line[cnt:])}</h{cnt}>\n\n"
+                )
                 continue
 
-        # If we have a horizontal rule, honor that. Otherwise, parse the line separately
-        md_line = md.render(line)
-        if md_line.startswith("<hr />"):
-            body_html += md_line
+        # If we have a horizontal rule, honor that. Otherwise, parse the line separately.
+        # A line on its own that matches the thematic break syntax always renders as
+        # a rule, so there's no need to run it through the Markdown renderer.
+        if honor_rules and _THEMATIC_BREAK_RE.fullmatch(line):
+            body_parts.append("<hr />\n")
         else:
-            body_html += poem_line_to_html(line)
+            body_parts.append(poem_line_to_html(line))
 
-    return header_html, body_html
+    return "".join(header_parts), "".join(body_parts)
 
 
 def render_poem_for_ebook(p: Path) -> str:
@@ -116,7 +205,7 @@ def render_poem_for_ebook(p: Path) -> str:
 
 def _remove_header_markdown(text: str) -> str:
     """Remove Markdown headers from text."""
-    return re.sub("#+[^#].*\n*", "", text)
+    return _HEADER_MD_RE.sub("", text)
 
 
 def render_story_for_website(p: Path) -> tuple[str, str | None, str | None]:
@@ -126,7 +215,7 @@ def render_story_for_website(p: Path) -> tuple[str, str | None, str | None]:
     :return: Tuple with the story's HTML, the original publication (if any),
     and the original copyright year (if any).
     """
-    text = p.read_text(encoding="utf-8")
+    text = read_text(p)
     copyright_year = None
     orig_publication = None
 
@@ -135,36 +224,18 @@ def render_story_for_website(p: Path) -> tuple[str, str | None, str | None]:
 
     # If the text has "First published in..." at the end, pull that out
     # and extract the year from it
-    m = re.search("First published in (.*)\n*", text)
+    m = _FIRST_PUBLISHED_RE.search(text)
     if m is not None:
         text = text[: m.start()] + text[m.end() :]
         orig_publication = _website_md.renderInline(m.group(1).strip())
 
     # Do the same for the year
-    m = re.search("Copyright (\(c\)|©) (\d+).+\n*", text)
+    m = _COPYRIGHT_RE.search(text)
     if m is not None:
         text = text[: m.start()] + text[m.end() :]
         copyright_year = m.group(2)
 
-    # Add Gutenberg block wrappers to various tags
-    with _website_md.reset_rules():
-        _website_md.add_render_rule(
-            "paragraph_open", lambda *args, **kwargs: "<!-- wp:paragraph -->\n<p>"
-        )
-        _website_md.add_render_rule(
-            "paragraph_close",
-            lambda *args, **kwargs: "</p>\n<!-- /wp:paragraph -->\n\n",
-        )
-        _website_md.add_render_rule(
-            "hr",
-            lambda *args, **kwargs: (
-                "<!-- wp:separator -->\n"
-                '<hr class="wp-block-separator has-alpha-channel=opacity scene-break">\n'
-                "<!-- /wp:separator -->\n\n"
-            ),
-        )
-
-        return _website_md.render(text), orig_publication, copyright_year
+    return _website_story_md.render(text), orig_publication, copyright_year
 
 
 def render_poem_for_website(p: Path) -> str:
@@ -173,25 +244,34 @@ def render_poem_for_website(p: Path) -> str:
     :param p: Path to the poem's markdown file.
     :return: HTML for the poem.
     """
-    _, body = _render_poem(p, _website_md, _poem_line_to_website_html)
+    # The poem block keeps the poem in a JSON attribute, where an <hr /> and its
+    # trailing newline don't belong, so rules are left as text (i.e. an em dash)
+    _, body = _render_poem(
+        p, _website_md, _poem_line_to_website_html, honor_rules=False
+    )
     return '<!-- wp:lazyblock/poem {"poem":"' + body + '"} /-->'
 
 
 def render_author_bio_for_website(p: Path) -> str:
     """Read the author bio from its markdown file and return it as HTML."""
-    return _website_md.renderInline(p.read_text(encoding="utf-8"))
+    return _website_md.renderInline(read_text(p))
 
 
 def title_to_slug(title: str) -> str:
     """Given a title, return a (potentially truncated) slug."""
-    title = title.translate(wp_slug_trans)
+    # The translation table only covers non-ASCII characters
+    if not title.isascii():
+        title = title.translate(wp_slug_trans)
     # Remove all non-alpha-numeric characters
-    title = re.sub("[^- \\w]", "", title)
+    title = _NON_SLUG_RE.sub("", title)
     split_post_slug = title.lower().split(" ")
-    post_slug_lengths = list(accumulate((len(s) + 1 for s in split_post_slug)))
-    with suppress(StopIteration):
-        max_ndx = next(ndx for ndx, item in enumerate(post_slug_lengths) if item > 40)
-        split_post_slug = split_post_slug[:max_ndx]
+    # Keep words until the slug (with its dashes) would run past 40 characters
+    slug_len = 0
+    for ndx, word in enumerate(split_post_slug):
+        slug_len += len(word) + 1
+        if slug_len > 40:
+            split_post_slug = split_post_slug[:ndx]
+            break
     return "-".join(split_post_slug).rstrip("-")
 
 
@@ -0,0 +1,24 @@
+from contextlib import ExitStack
+
+import build_ebook as uut
+
+
+class TestMapFile:
+    def test_closes_map_when_stack_is_closed(self, tmp_path):
+        p = tmp_path / "avatar.jpg"
+        p.write_bytes(b"jpeg bytes")
+
+        with ExitStack() as maps:
+            result = uut._map_file(p, maps)
+            assert result[:] == b"jpeg bytes"
+
+        assert result.closed
+
+    def test_returns_empty_bytes_for_empty_file(self, tmp_path):
+        p = tmp_path / "avatar.jpg"
+        p.write_bytes(b"")
+
+        with ExitStack() as maps:
+            result = uut._map_file(p, maps)
+
+        assert result == b""
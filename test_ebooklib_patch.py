@@ -0,0 +1,132 @@
+import struct
+import zipfile
+
+import pytest
+from ebooklib import epub
+from lxml import etree
+
+import ebooklib_patch as uut
+
+
+def make_jpeg_header(width: int, height: int, sof_marker: int = 0xC0) -> bytes:
+    app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    return (
+        b"\xff\xd8"
+        + b"\xff\xe0"
+        + struct.pack(">H", len(app0) + 2)
+        + app0
+        + bytes((0xFF, sof_marker))
+        + struct.pack(">HBHHB", 11, 8, height, width, 1)
+        + b"\x01\x11\x00"
+    )
+
+
+class TestJpegSize:
+    def test_returns_width_and_height_from_baseline_frame(self, tmp_path):
+        p = tmp_path / "cover.jpg"
+        p.write_bytes(make_jpeg_header(1200, 1600))
+
+        result = uut._jpeg_size(p)
+
+        assert result == (1200, 1600)
+
+    def test_returns_width_and_height_from_progressive_frame(self, tmp_path):
+        p = tmp_path / "cover.jpg"
+        p.write_bytes(make_jpeg_header(640, 480, sof_marker=0xC2))
+
+        result = uut._jpeg_size(p)
+
+        assert result == (640, 480)
+
+    def test_raises_error_on_non_jpeg_file(self, tmp_path):
+        p = tmp_path / "cover.jpg"
+        p.write_bytes(b"\x89PNG\r\n\x1a\n")
+
+        with pytest.raises(ValueError, match="isn't a JPEG"):
+            uut._jpeg_size(p)
+
+        # Test passes if exception is raised
+
+    def test_raises_error_if_no_frame_is_found(self, tmp_path):
+        p = tmp_path / "cover.jpg"
+        p.write_bytes(b"\xff\xd8\xff\xd9")
+
+        with pytest.raises(ValueError, match="Couldn't find the image size"):
+            uut._jpeg_size(p)
+
+        # Test passes if exception is raised
+
+    def test_raises_error_on_truncated_file(self, tmp_path):
+        p = tmp_path / "cover.jpg"
+        # Cut off partway through the start-of-frame segment
+        p.write_bytes(make_jpeg_header(1200, 1600)[:-8])
+
+        with pytest.raises(ValueError, match="truncated"):
+            uut._jpeg_size(p)
+
+        # Test passes if exception is raised
+
+
+class TestWriteEpub:
+    def test_stores_images_without_compressing_them(self, tmp_path):
+        book = epub.EpubBook()
+        book.set_identifier("id")
+        book.set_title("title")
+        book.set_language("en")
+        ch = epub.EpubHtml(title="ch", file_name="ch.xhtml", lang="en")
+        ch.set_content("<p>Text</p>")
+        book.add_item(ch)
+        book.add_item(
+            epub.EpubImage(
+                uid="img",
+                file_name="img.jpg",
+                media_type="image/jpeg",
+                content=make_jpeg_header(1, 1),
+            )
+        )
+        book.add_item(epub.EpubNcx())
+        book.add_item(epub.EpubNav())
+        book.spine = (ch,)
+        book.toc = (ch,)
+        p = tmp_path / "book.epub"
+
+        uut.write_epub(p, book)
+
+        with zipfile.ZipFile(p) as z:
+            assert z.getinfo("EPUB/img.jpg").compress_type == zipfile.ZIP_STORED
+            assert z.getinfo("EPUB/ch.xhtml").compress_type == zipfile.ZIP_DEFLATED
+
+
+class TestSWEpubWriterGetNav:
+    def get_toc_paragraphs(self, toc):
+        book = epub.EpubBook()
+        book.set_title("title")
+        book.set_language("en")
+        book.toc = toc
+        writer = uut.SWEpubWriter("book.epub", book)
+
+        nav = etree.fromstring(writer._get_nav(epub.EpubNav()))
+
+        div = nav.find(".//{*}div[@class='toc']")
+        return [(p[0].get("href"), p[0].text) for p in div] if len(div) else []
+
+    def test_puts_each_chapter_link_in_a_paragraph(self):
+        toc = (epub.EpubHtml(title="Chapter", file_name="ch.xhtml"),)
+
+        result = self.get_toc_paragraphs(toc)
+
+        assert result == [("ch.xhtml", "Chapter")]
+
+    def test_puts_each_link_in_a_paragraph(self):
+        toc = (epub.Link("link.xhtml", "Link", "link"),)
+
+        result = self.get_toc_paragraphs(toc)
+
+        assert result == [("link.xhtml", "Link")]
+
+    def test_skips_unsupported_entries_without_leaving_empty_paragraphs(self):
+        toc = (epub.Section("Section"),)
+
+        result = self.get_toc_paragraphs(toc)
+
+        assert result == []
@@ -0,0 +1,56 @@
+from unittest.mock import Mock
+
+import file_cache as uut
+
+
+class TestReadText:
+    def test_returns_file_contents(self):
+        p = Mock(name="path")
+        p.read_text.return_value = "contents"
+
+        result = uut.read_text(p)
+
+        assert result == "contents"
+
+    def test_only_reads_an_unmodified_file_once(self):
+        p = Mock(name="path")
+        p.read_text.return_value = "contents"
+        p.stat.return_value.st_mtime_ns = 1
+
+        uut.read_text(p)
+        result = uut.read_text(p)
+
+        assert result == "contents"
+        p.read_text.assert_called_once()
+
+    def test_rereads_a_modified_file(self):
+        p = Mock(name="path")
+        p.read_text.return_value = "old"
+        p.stat.return_value.st_mtime_ns = 1
+        uut.read_text(p)
+        p.read_text.return_value = "new"
+        p.stat.return_value.st_mtime_ns = 2
+
+        result = uut.read_text(p)
+
+        assert result == "new"
+
+
+class TestReadLines:
+    def test_returns_lines_without_line_endings(self):
+        p = Mock(name="path")
+        p.read_text.return_value = "one\ntwo\r\nthree"
+
+        result = uut.read_lines(p)
+
+        assert result == ("one", "two", "three")
+
+    def test_shares_the_read_with_read_text(self):
+        p = Mock(name="path")
+        p.read_text.return_value = "one\ntwo"
+        p.stat.return_value.st_mtime_ns = 1
+
+        uut.read_text(p)
+        uut.read_lines(p)
+
+        p.read_text.assert_called_once()
@@ -6,13 +6,16 @@ import issue_info as uut
 
 
 class TestIssueInfo:
-    def test_piece_info_iterates_over_piece_path_title_bio_path_and_author_names(self):
+    def test_piece_info_iterates_over_piece_path_kind_title_bio_path_and_author_names(
+        self,
+    ):
         info = uut.IssueInfo(
             issue_num=1,
             cover_path=Mock(name="cover_path"),
             description="desc",
             editors=["a", "b"],
             piece_paths=["piece_path_1", "piece_path_2"],
+            piece_kinds=["story", "poem"],
             piece_post_days=[0, 2],
             titles=["one", "two"],
             bio_paths=["bio_path_1", "bio_path_2"],
@@ -23,8 +26,8 @@ class TestIssueInfo:
         result = info.piece_info()
 
         assert list(result) == [
-            ("piece_path_1", 0, "one", "bio_path_1", "ky", "av1"),
-            ("piece_path_2", 2, "two", "bio_path_2", "se", "av2"),
+            ("piece_path_1", "story", 0, "one", "bio_path_1", "ky", "av1"),
+            ("piece_path_2", "poem", 2, "two", "bio_path_2", "se", "av2"),
         ]
 
 
@@ -78,6 +81,36 @@ class TestGetTitlesAndAuthors:
 
         assert result == ["Mx. Author"]
 
+    def test_ignores_deeper_headings_and_closing_hashes(self):
+        contents = "\n".join(["### Not a title", "# Title ##", "## Mx. Author #"])
+        p = Mock(name="piece_path")
+        p.read_text.return_value = contents
+
+        titles, authors = uut.get_titles_and_authors([p])
+
+        assert titles == ["Title"]
+        assert authors == ["Mx. Author"]
+
+    def test_ignores_headings_in_fenced_code_blocks(self):
+        contents = "\n".join(
+            ["```", "# Not a title", "```", "# Title", "## Mx. Author"]
+        )
+        p = Mock(name="piece_path")
+        p.read_text.return_value = contents
+
+        result, _ = uut.get_titles_and_authors([p])
+
+        assert result == ["Title"]
+
+    def test_finds_headings_in_blockquotes(self):
+        contents = "\n".join(["> # Title", "", "## Mx. Author"])
+        p = Mock(name="piece_path")
+        p.read_text.return_value = contents
+
+        result, _ = uut.get_titles_and_authors([p])
+
+        assert result == ["Title"]
+
     def test_strips_by_from_author_name(self):
         contents = "\n".join(["# Title", "## by  Mx. Author"])
         p = Mock(name="piece_path")
@@ -87,6 +120,15 @@ class TestGetTitlesAndAuthors:
 
         assert result == ["Mx. Author"]
 
+    def test_leaves_by_inside_author_name(self):
+        contents = "\n".join(["# Title", "## Abby Smith"])
+        p = Mock(name="piece_path")
+        p.read_text.return_value = contents
+
+        _, result = uut.get_titles_and_authors([p])
+
+        assert result == ["Abby Smith"]
+
     def test_raises_exception_on_missing_title(self):
         contents = "## Title"
         p = Mock(name="piece_path")
@@ -106,3 +148,32 @@ class TestGetTitlesAndAuthors:
             uut.get_titles_and_authors([p])
 
         # Test passes if exception is raised
+
+
+class TestGetIssueInfo:
+    def test_raises_error_listing_all_missing_files(self, tmp_path):
+        (tmp_path / "0a-about.md").write_text("Issue 1", encoding="utf-8")
+
+        with pytest.raises(FileNotFoundError) as excinfo:
+            uut.get_issue_info(tmp_path)
+
+        msg = str(excinfo.value)
+        assert "editors.txt" in msg
+        assert "9-author.jpg" in msg
+        assert "0a-about.md" not in msg
+
+    def test_succeeds_without_a_cover(self, tmp_path):
+        (tmp_path / "0a-about.md").write_text("Issue 7", encoding="utf-8")
+        (tmp_path / "description.html").write_text("<p>Desc</p>", encoding="utf-8")
+        (tmp_path / "editors.txt").write_text("Ed One\nEd Two", encoding="utf-8")
+        for num, kind in enumerate(("story", "poem", "reprint") * 3, start=1):
+            (tmp_path / f"{num}a-{kind}.md").write_text(
+                f"# Title {num}\n\n## By Author {num}\n", encoding="utf-8"
+            )
+            (tmp_path / f"{num}b-author.md").write_text("Bio", encoding="utf-8")
+            (tmp_path / f"{num}-author.jpg").write_bytes(b"jpeg")
+
+        result = uut.get_issue_info(tmp_path)
+
+        assert result.issue_num == 7
+        assert result.cover_path == tmp_path / "cover.jpg"
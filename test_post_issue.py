@@ -1,5 +1,10 @@
+import base64
 import datetime
+import json
+import threading
+import time
 from unittest.mock import Mock, patch
+from zoneinfo import ZoneInfo
 
 import pytest
 import requests
@@ -16,11 +21,33 @@ def make_resp_mock(*, status_code=200, json_ret=None, reason=None, url=None):
     return resp
 
 
+class TestCheckResponse:
+    def test_leaves_successful_response_body_unparsed(self):
+        resp = make_resp_mock(status_code=200)
+
+        uut.check_response(resp)
+
+        resp.json.assert_not_called()
+
+    def test_raises_error_with_reason_on_server_error(self):
+        resp = make_resp_mock(
+            status_code=502, json_ret={"message": "Bad gateway"}, url="https://x/"
+        )
+
+        with pytest.raises(
+            requests.HTTPError,
+            match="Error posting. 502 Server Error: Bad gateway for url: https://x/",
+        ):
+            uut.check_response(resp, "posting")
+
+        # Test passes if exception raised
+
+
 class TestGetToken:
     def test_gets_token(self):
-        uut.host_info = {"host": "https://localhost/"}
-        with patch.object(uut, "requests", name="mock_req") as mock_requests:
-            mock_requests.post.side_effect = (
+        uut.host_info = uut.HostInfo(host="https://localhost/")
+        with patch.object(uut, "session", name="mock_session") as mock_session:
+            mock_session.post.side_effect = (
                 lambda endpoint, json, **kwargs: make_resp_mock(
                     json_ret={
                         "token": f"{endpoint}-{json['username']}-{json['password']}"
@@ -33,10 +60,9 @@ class TestGetToken:
         assert token == "https://localhost/wp-json/jwt-auth/v1/token-user-pass"
 
     def test_explains_authentication_error(self):
-        uut.host_info = {"host": "https://localhost/"}
-        with patch.object(uut, "requests", name="mock_req") as mock_requests:
-            mock_requests.HTTPError = requests.HTTPError
-            mock_requests.post.side_effect = (
+        uut.host_info = uut.HostInfo(host="https://localhost/")
+        with patch.object(uut, "session", name="mock_session") as mock_session:
+            mock_session.post.side_effect = (
                 lambda endpoint, json, **kwargs: make_resp_mock(
                     status_code=403,
                     reason="forbidden",
@@ -54,11 +80,9 @@ class TestGetToken:
         # Test passes if exception raised
 
     def test_raises_generic_error_on_non_200_status(self):
-        uut.host_info = {"host": "https://localhost/"}
-        with patch.object(uut, "requests", name="mock_req") as mock_requests:
-            mock_requests.HTTPError = requests.HTTPError
-            mock_requests.JSONDecodeError = requests.JSONDecodeError
-            mock_requests.post.side_effect = (
+        uut.host_info = uut.HostInfo(host="https://localhost/")
+        with patch.object(uut, "session", name="mock_session") as mock_session:
+            mock_session.post.side_effect = (
                 lambda endpoint, json, **kwargs: make_resp_mock(
                     status_code=404,
                     reason="just because",
@@ -75,36 +99,239 @@ class TestGetToken:
         # Test passes if exception raised
 
 
+def make_jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({"exp": exp}).encode())
+    return "header." + payload.decode().rstrip("=") + ".signature"
+
+
+class TestSetupToken:
+    def test_puts_token_in_the_session_headers(self, tmp_path):
+        uut.host_info = uut.HostInfo(
+            host="https://localhost/", username="user", password="pass", use_2fa=False
+        )
+        with (
+            patch.object(uut, "token_cache_path", tmp_path / "token.json"),
+            patch.object(uut, "session", name="mock_session") as mock_session,
+            patch.object(uut, "get_token", return_value="new-token"),
+        ):
+            mock_session.headers = {"Authorization": "Bearer expired"}
+
+            uut.setup_token()
+
+        assert mock_session.headers == {"Authorization": "Bearer new-token"}
+
+    def test_gets_2fa_code_from_the_environment(self, tmp_path, monkeypatch):
+        uut.host_info = uut.HostInfo(
+            host="https://localhost/", username="user", password="pass", use_2fa=True
+        )
+        monkeypatch.setenv("SWEPUB_WP_2FA", "123456")
+        with (
+            patch.object(uut, "token_cache_path", tmp_path / "token.json"),
+            patch.object(uut, "session", name="mock_session") as mock_session,
+            patch.object(uut, "get_token", return_value="token") as mock_get_token,
+        ):
+            mock_session.headers = {}
+
+            uut.setup_token()
+
+        mock_get_token.assert_called_once_with("user", "pass123456")
+
+    def test_reuses_token_saved_by_earlier_run(self, tmp_path):
+        uut.host_info = uut.HostInfo(
+            host="https://localhost/", username="user", password="pass", use_2fa=False
+        )
+        token = make_jwt(time.time() + 3600)
+        with (
+            patch.object(uut, "token_cache_path", tmp_path / "token.json"),
+            patch.object(uut, "session", name="mock_session") as mock_session,
+            patch.object(uut, "get_token", return_value=token) as mock_get_token,
+        ):
+            mock_session.headers = {}
+            uut.setup_token()
+
+            uut.setup_token()
+
+        assert mock_get_token.call_count == 1
+        assert mock_session.headers == {"Authorization": f"Bearer {token}"}
+
+    def test_gets_new_token_when_saved_one_is_about_to_expire(self, tmp_path):
+        uut.host_info = uut.HostInfo(
+            host="https://localhost/", username="user", password="pass", use_2fa=False
+        )
+        token = make_jwt(time.time() + 30)
+        with (
+            patch.object(uut, "token_cache_path", tmp_path / "token.json"),
+            patch.object(uut, "session", name="mock_session") as mock_session,
+            patch.object(uut, "get_token", return_value=token) as mock_get_token,
+        ):
+            mock_session.headers = {}
+            uut.setup_token()
+
+            uut.setup_token()
+
+        assert mock_get_token.call_count == 2
+
+    def test_other_threads_keep_sending_the_old_token_during_a_refresh(self, tmp_path):
+        uut.host_info = uut.HostInfo(
+            host="https://localhost/", username="user", password="pass", use_2fa=False
+        )
+        refreshing = threading.Event()
+        other_request_sent = threading.Event()
+        sent_headers = []
+
+        def fake_get_token(username, password):
+            refreshing.set()
+            other_request_sent.wait(timeout=5)
+            return "new-token"
+
+        def fake_request(*args, **kwargs):
+            sent_headers.append(dict(mock_session.headers))
+            other_request_sent.set()
+            return make_resp_mock()
+
+        with (
+            patch.object(uut, "token_cache_path", tmp_path / "token.json"),
+            patch.object(uut, "session", name="mock_session") as mock_session,
+            patch.object(uut, "get_token", side_effect=fake_get_token),
+            patch.object(uut, "current_token", "old-token"),
+            patch.object(uut, "token_expiration_time", None),
+        ):
+            mock_session.headers = {"Authorization": "Bearer old-token"}
+            mock_session.request.side_effect = fake_request
+            refresher = threading.Thread(target=uut.refresh_token, args=("old-token",))
+            refresher.start()
+            refreshing.wait(timeout=5)
+
+            uut.wp_request(uut.REST.GET, "media")
+            refresher.join(timeout=5)
+
+        assert sent_headers == [{"Authorization": "Bearer old-token"}]
+        assert mock_session.headers == {"Authorization": "Bearer new-token"}
+
+
 class TestWpRestUrl:
     def test_returns_url_with_default_namespace(self):
-        uut.host_info = {"host": "https://testy.com"}
+        uut.host_info = uut.HostInfo(host="https://testy.com")
 
         result = uut.wp_rest_url("media")
 
         assert result == "https://testy.com/wp-json/wp/v2/media"
 
     def test_returns_url_with_passed_namespace(self):
-        uut.host_info = {"host": "https://testy.com"}
+        uut.host_info = uut.HostInfo(host="https://testy.com")
 
         result = uut.wp_rest_url("media", "sg/v1/")
 
         assert result == "https://testy.com/wp-json/sg/v1/media"
 
     def test_works_with_namespaces_that_lack_an_ending_slash(self):
-        uut.host_info = {"host": "https://testy.com"}
+        uut.host_info = uut.HostInfo(host="https://testy.com")
 
         result = uut.wp_rest_url("media", "sg/v1")
 
         assert result == "https://testy.com/wp-json/sg/v1/media"
 
     def test_works_even_when_slashes_abound(self):
-        uut.host_info = {"host": "https://testy.com"}
+        uut.host_info = uut.HostInfo(host="https://testy.com")
 
         result = uut.wp_rest_url("/media", "sg/v1/")
 
         assert result == "https://testy.com/wp-json/sg/v1/media"
 
 
+class TestWpRequest:
+    def test_gets_new_token_when_current_one_is_about_to_expire(self):
+        uut.host_info = uut.HostInfo(host="https://localhost/")
+        with (
+            patch.object(uut, "current_token", "old-token"),
+            patch.object(uut, "token_expiration_time", time.time() + 10),
+            patch.object(uut, "session", name="mock_session") as mock_session,
+            patch.object(uut, "setup_token") as mock_setup_token,
+        ):
+            mock_session.request.return_value = make_resp_mock()
+
+            uut.wp_request(uut.REST.GET, "media")
+
+        mock_setup_token.assert_called_once_with(use_cache=False)
+
+    def test_keeps_token_that_has_time_left(self):
+        uut.host_info = uut.HostInfo(host="https://localhost/")
+        with (
+            patch.object(uut, "current_token", "old-token"),
+            patch.object(uut, "token_expiration_time", time.time() + 3600),
+            patch.object(uut, "session", name="mock_session") as mock_session,
+            patch.object(uut, "setup_token") as mock_setup_token,
+        ):
+            mock_session.request.return_value = make_resp_mock()
+
+            uut.wp_request(uut.REST.GET, "media")
+
+        mock_setup_token.assert_not_called()
+
+
+class TestWpBatch:
+    def test_sends_requests_in_batches_of_25(self):
+        batch = [(uut.REST.POST, "piece", {"n": n}) for n in range(30)]
+        with patch.object(
+            uut,
+            "wp_request",
+            side_effect=lambda *args, **kwargs: make_resp_mock(
+                json_ret={
+                    "responses": [
+                        {"status": 201, "body": {"id": sub["body"]["n"]}}
+                        for sub in kwargs["json"]["requests"]
+                    ]
+                }
+            ),
+        ) as mock_wp_request:
+
+            result = uut.wp_batch(batch)
+
+        assert mock_wp_request.call_count == 2
+        assert result == [{"id": n} for n in range(30)]
+
+    def test_sends_requests_one_by_one_when_site_lacks_batch_endpoint(self):
+        batch = [(uut.REST.POST, "piece", {"n": n}) for n in range(2)]
+
+        def fake_wp_request(verb, endpoint, *args, **kwargs):
+            if endpoint == "v1":
+                raise requests.HTTPError(
+                    "not found", response=make_resp_mock(status_code=404)
+                )
+            return make_resp_mock(json_ret={"id": kwargs["json"]["n"]})
+
+        with (
+            patch.object(uut, "warn"),
+            patch.object(uut, "wp_request", side_effect=fake_wp_request),
+        ):
+
+            result = uut.wp_batch(batch)
+
+        assert result == [{"id": 0}, {"id": 1}]
+
+    def test_raises_error_when_a_request_fails(self):
+        batch = [(uut.REST.POST, "piece", {}), (uut.REST.POST, "piece", {})]
+        resp = make_resp_mock(
+            json_ret={
+                "failed": "validation",
+                "responses": [
+                    None,
+                    {"status": 400, "body": {"message": "Invalid slug"}},
+                ],
+            },
+            url="https://localhost/wp-json/batch/v1",
+        )
+        with patch.object(uut, "wp_request", return_value=resp):
+
+            with pytest.raises(
+                requests.HTTPError,
+                match="Error posting. 400 error in batch request: Invalid slug",
+            ):
+                uut.wp_batch(batch, "posting")
+
+        # Test passes if exception raised
+
+
 class TestIssueReleaseTime:
     def test_returns_the_first_monday_of_january_at_11_central_standard(self):
         d = datetime.date(year=2000, month=1, day=17)
@@ -120,10 +347,25 @@ class TestIssueReleaseTime:
 
         assert result.isoformat() == "2000-06-05T16:00:00"
 
+    def test_uses_standard_time_when_daylight_saving_ends_before_the_first_monday(
+        self,
+    ):
+        d = datetime.date(year=2022, month=11, day=1)
+
+        result = uut.issue_release_time(d)
+
+        assert result.isoformat() == "2022-11-07T17:00:00"
+
     def test_returns_the_first_monday_of_the_next_month_from_december(self):
         with patch.object(uut, "datetime") as mock_datetime:
-            mock_datetime.utcnow.return_value = datetime.datetime(
-                year=1999, month=12, day=30, hour=12, minute=13, second=14
+            mock_datetime.now.return_value = datetime.datetime(
+                year=1999,
+                month=12,
+                day=30,
+                hour=12,
+                minute=13,
+                second=14,
+                tzinfo=ZoneInfo("America/Chicago"),
             )
 
             result = uut.issue_release_time()
@@ -134,8 +376,14 @@ class TestIssueReleaseTime:
         self,
     ):
         with patch.object(uut, "datetime") as mock_datetime:
-            mock_datetime.utcnow.return_value = datetime.datetime(
-                year=2024, month=3, day=20, hour=12, minute=13, second=14
+            mock_datetime.now.return_value = datetime.datetime(
+                year=2024,
+                month=3,
+                day=20,
+                hour=12,
+                minute=13,
+                second=14,
+                tzinfo=ZoneInfo("America/Chicago"),
             )
 
             result = uut.issue_release_time()
@@ -192,7 +440,8 @@ class TestGetExistingWpObject:
 
         assert result == 7
 
-    def test_raises_error_when_more_than_one_object_is_found(self, mock_click):
+    def test_asks_user_to_pick_when_more_than_one_object_is_found(self, mock_click):
+        mock_click.prompt.return_value = 2
         mock_request = Mock()
         mock_request.json.return_value = [
             {"id": 7, "title": {"rendered": "id-7"}},
@@ -200,9 +449,242 @@ class TestGetExistingWpObject:
         ]
         with patch.object(uut, "wp_request", return_value=mock_request):
 
-            with pytest.raises(
-                RuntimeError, match="an existing obj, we found multiple"
-            ):
-                uut.get_existing_wp_object("obj", "endpoint", search="test")
+            result = uut.get_existing_wp_object("obj", "endpoint", search="test")
+
+        assert (
+            "an existing obj, we found multiple" in mock_click.secho.call_args.args[0]
+        )
+        assert result == 8
+
+    def test_returns_none_when_user_picks_none_of_multiple_objects(self, mock_click):
+        mock_click.prompt.return_value = 0
+        mock_request = Mock()
+        mock_request.json.return_value = [
+            {"id": 7, "name": "Author 7"},
+            {"id": 8, "name": "Author 8"},
+        ]
+        with patch.object(uut, "wp_request", return_value=mock_request):
+
+            result = uut.get_existing_wp_object("obj", "endpoint", search="test")
+
+        assert result is None
+
+
+@patch.object(uut, "click")
+class TestCreateIssue:
+    def test_creates_issue_with_cover_when_issue_does_not_exist(self, mock_click):
+        info = Mock(issue_num=7)
+        with (
+            patch.object(uut, "create_cover", return_value=3),
+            patch.object(uut, "get_existing_wp_object", return_value=None),
+            patch.object(uut, "create_issue_info", return_value=11) as mock_create,
+        ):
+
+            result = uut.create_issue(info, "post date")
+
+        mock_create.assert_called_once_with(info, 3, "post date")
+        assert result == 11
+
+    def test_skips_creating_issue_that_already_exists(self, mock_click):
+        info = Mock(issue_num=7)
+        with (
+            patch.object(uut, "create_cover", return_value=3),
+            patch.object(
+                uut,
+                "get_existing_wp_object",
+                side_effect=lambda *args, **kwargs: (
+                    5 if kwargs["slug"] == "7" else None
+                ),
+            ),
+            patch.object(uut, "create_issue_info") as mock_create,
+        ):
+
+            result = uut.create_issue(info, "post date")
+
+        mock_create.assert_not_called()
+        assert result == 5
+
+
+@patch.object(uut, "click")
+class TestGetExistingWpObjectsBySlug:
+    def test_returns_ids_of_found_slugs_from_one_request(self, mock_click):
+        mock_request = Mock()
+        mock_request.json.return_value = [
+            {"id": 7, "slug": "first"},
+            {"id": 9, "slug": "third"},
+        ]
+        with patch.object(
+            uut, "wp_request", return_value=mock_request
+        ) as mock_wp_request:
+
+            result = uut.get_existing_wp_objects_by_slug(
+                "piece", "piece", ["first", "second", "third"]
+            )
+
+        assert mock_wp_request.call_count == 1
+        assert (
+            mock_wp_request.call_args.kwargs["params"]["slug"] == "first,second,third"
+        )
+        assert result == {"first": 7, "third": 9}
+
+
+@patch.object(uut, "click")
+class TestGetExistingWpObjectsBySearch:
+    def test_searches_once_per_string_and_asks_user_only_about_multiple_matches(
+        self, mock_click
+    ):
+        mock_click.prompt.return_value = 2
+        found = {
+            "one": [{"id": 7, "name": "One"}],
+            "none": [],
+            "many": [{"id": 8, "name": "Many"}, {"id": 9, "name": "Many Too"}],
+        }
+        with patch.object(
+            uut,
+            "wp_request",
+            side_effect=lambda *args, **kwargs: make_resp_mock(
+                json_ret=found[kwargs["params"]["search"]]
+            ),
+        ) as mock_wp_request:
+
+            result = uut.get_existing_wp_objects_by_search(
+                "author", "ppma_author", ["one", "none", "many", "one"]
+            )
+
+        assert mock_wp_request.call_count == 3
+        assert mock_click.prompt.call_count == 1
+        assert result == {"one": 7, "none": None, "many": 9}
+
+
+class TestUploadImage:
+    def test_sends_metadata_along_with_the_image(self, tmp_path):
+        img = tmp_path / "cover.jpg"
+        img.write_bytes(b"jpeg bytes")
+        with patch.object(
+            uut, "wp_request", return_value=make_resp_mock(json_ret={"id": 12})
+        ) as mock_wp_request:
+
+            result = uut.upload_image(img, "c.jpg", "Title", "Alt text", "slug")
+
+        assert mock_wp_request.call_count == 1
+        assert mock_wp_request.call_args.kwargs["params"] == {
+            "title": "Title",
+            "alt_text": "Alt text",
+            "slug": "slug",
+        }
+        assert result == 12
+
+
+class TestMoveImagesToRmlFolder:
+    def test_warns_with_available_folders_when_folder_does_not_exist(self):
+        uut.rml_folders = {"covers": 1, "headshots": 2}
+        with (
+            patch.object(uut, "warn") as mock_warn,
+            patch.object(uut, "wp_request") as mock_wp_request,
+        ):
+
+            uut.move_images_to_rml_folder([7], "Missing")
+
+        assert "Available folders: covers, headshots" in mock_warn.call_args.args[0]
+        mock_wp_request.assert_not_called()
+
+    def test_matches_folder_names_regardless_of_case(self):
+        uut.rml_folders = {"covers": 1, "headshots": 2}
+        with patch.object(uut, "wp_request") as mock_wp_request:
+
+            uut.move_images_to_rml_folder([7, 8], "Covers")
+
+        assert mock_wp_request.call_args.kwargs["json"] == {
+            "ids": [7, 8],
+            "to": 1,
+            "isCopy": False,
+        }
+
+
+@patch.object(uut, "click")
+class TestCreateAuthorAvatars:
+    def test_uploads_missing_avatars_once_per_author(self, mock_click):
+        with (
+            patch.object(
+                uut,
+                "get_existing_wp_objects_by_search",
+                side_effect=lambda obj_name, endpoint, searches, **kwargs: {
+                    search: 3 if search == "Found" else None for search in searches
+                },
+            ),
+            patch.object(
+                uut,
+                "upload_author_avatar",
+                side_effect=lambda name, path: {"A": 5, "B": 6}[name],
+            ) as mock_upload,
+            patch.object(uut, "move_images_to_rml_folder") as mock_move,
+        ):
+
+            result = uut.create_author_avatars(
+                ["A", "Found", "B", "A"], ["a.jpg", "f.jpg", "b.jpg", "a.jpg"]
+            )
+
+        assert mock_upload.call_count == 2
+        mock_move.assert_called_once_with([5, 6], "headshots")
+        assert result == {"A": 5, "Found": 3, "B": 6}
+
+    def test_uploads_the_avatar_from_an_authors_first_piece(self, mock_click):
+        with (
+            patch.object(
+                uut,
+                "get_existing_wp_objects_by_search",
+                side_effect=lambda obj_name, endpoint, searches, **kwargs: {
+                    search: None for search in searches
+                },
+            ),
+            patch.object(uut, "upload_author_avatar", return_value=5) as mock_upload,
+            patch.object(uut, "move_images_to_rml_folder"),
+        ):
+
+            uut.create_author_avatars(["A", "A"], ["first.jpg", "second.jpg"])
+
+        mock_upload.assert_called_once_with("A", "first.jpg")
+
+
+@patch.object(uut, "click")
+class TestCreateAuthors:
+    def test_creates_missing_authors_once_each(self, mock_click):
+        with (
+            patch.object(
+                uut,
+                "get_existing_wp_objects_by_search",
+                side_effect=lambda obj_name, endpoint, searches, **kwargs: {
+                    search: 3 if search == "Found" else None for search in searches
+                },
+            ),
+            patch.object(
+                uut,
+                "create_new_author",
+                side_effect=lambda name, bio_path, avatar_id: avatar_id + 10,
+            ) as mock_create,
+        ):
+
+            result = uut.create_authors(
+                ["A", "Found", "A"],
+                ["a.md", "f.md", "a.md"],
+                {"A": 1, "Found": 2},
+            )
+
+        mock_create.assert_called_once_with("A", "a.md", 1)
+        assert result == {"A": 11, "Found": 3}
+
+    def test_creates_author_with_the_bio_from_their_first_piece(self, mock_click):
+        with (
+            patch.object(
+                uut,
+                "get_existing_wp_objects_by_search",
+                side_effect=lambda obj_name, endpoint, searches, **kwargs: {
+                    search: None for search in searches
+                },
+            ),
+            patch.object(uut, "create_new_author", return_value=11) as mock_create,
+        ):
+
+            uut.create_authors(["A", "A"], ["first.md", "second.md"], {"A": 1})
 
-        # Test passes if the exception is raised
+        mock_create.assert_called_once_with("A", "first.md", 1)
@@ -5,6 +5,15 @@ import pytest
 import renderers as uut
 
 
+class TestRenderMarkdownForEbook:
+    def test_renders_markdown_with_typographic_quotes_and_dashes(self):
+        text = 'Para "with quotes" -- and a dash.'
+
+        result = uut.render_markdown_for_ebook(text)
+
+        assert result == "<p>Para “with quotes” – and a dash.</p>\n"
+
+
 class TestRenderStoryForEbook:
     def test_renders_basic_markdown(self):
         text = "Para 1 _with italics_.\n\nPara 2 **with bold**."
@@ -25,6 +34,14 @@ class TestRenderStoryForEbook:
 
         assert result == '<p>Para 1.</p>\n<p class="noindent">Para 2.</p>\n'
 
+    def test_changes_self_closing_html_hr_to_noindent_para(self):
+        text = "Para 1.\n\n<hr />\n\nPara 2."
+        mock_path = Mock(read_text=Mock(side_effect=lambda *args, **kwargs: text))
+
+        result = uut.render_story_for_ebook(mock_path)
+
+        assert result == '<p>Para 1.</p>\n<p class="noindent">Para 2.</p>\n'
+
 
 class TestRenderPoemForEbook:
     def test_converts_two_hashes_to_heading_2(self):
@@ -79,6 +96,19 @@ class TestRenderPoemForEbook:
             + '<div class="poem">second line</div>\n'
         )
 
+    def test_honors_spaced_out_horizontal_rules(self):
+        text = "first line\n * * *\nsecond line\n"
+        mock_path = Mock(read_text=Mock(side_effect=lambda *args, **kwargs: text))
+
+        result = uut.render_poem_for_ebook(mock_path)
+
+        assert (
+            result
+            == '<div class="poem">first line</div>\n'
+            + "<hr />\n"
+            + '<div class="poem">second line</div>\n'
+        )
+
     def test_parses_markdown_in_a_given_line(self):
         text = "_first_ line\n**second** line\n"
         mock_path = Mock(read_text=Mock(side_effect=lambda *args, **kwargs: text))
@@ -178,6 +208,18 @@ class TestRenderStoryForWebsite:
             "<!-- /wp:paragraph -->\n\n"
         )
 
+    def test_leaves_hash_marks_in_the_middle_of_a_line(self):
+        text = "It was issue #5 of the zine.\n"
+        mock_path = Mock(read_text=Mock(side_effect=lambda *args, **kwargs: text))
+
+        result, _, _ = uut.render_story_for_website(mock_path)
+
+        assert result == (
+            "<!-- wp:paragraph -->\n"
+            "<p>It was issue #5 of the zine.</p>\n"
+            "<!-- /wp:paragraph -->\n\n"
+        )
+
     def test_returns_copyright_year_if_available(self):
         text = "Copyright (c) 2017, N. E. Body\n"
         mock_path = Mock(read_text=Mock(side_effect=lambda *args, **kwargs: text))
@@ -223,6 +265,20 @@ class TestRenderPoemForWebsite:
             '"} /-->'
         )
 
+    def test_leaves_horizontal_rules_as_text(self):
+        text = "first line\n---\nsecond line"
+        mock_path = Mock(read_text=Mock(side_effect=lambda *args, **kwargs: text))
+
+        result = uut.render_poem_for_website(mock_path)
+
+        assert result == (
+            '<!-- wp:lazyblock/poem {"poem":"'
+            "first line\\u003cbr\\u003e"
+            "—\\u003cbr\\u003e"
+            "second line\\u003cbr\\u003e"
+            '"} /-->'
+        )
+
 
 class TestRenderAuthorBioForWebsite:
     def test_bio_strips_para_tags(self):